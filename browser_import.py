@@ -5,24 +5,39 @@ Browser-based Product Import (Fallback)
 Uses Playwright to automate the admin UI when direct database access isn't possible.
 
 Usage:
-    pip install playwright pandas openpyxl
+    pip install playwright pandas openpyxl requests
     playwright install chromium
 
     python browser_import.py products.xlsx --headless
     python browser_import.py products.xlsx --visible  # Debug mode
 
+API shortcut:
+    Run --discover and add one product by hand in the browser. The "Add Product"
+    POST is saved to CM_ADMIN_API_CAPTURE, and later imports replay it over plain
+    HTTP (no page rendering), falling back to the browser if the API rejects it.
+
+Logins are cached per user in ~/.cache/cm_admin/ for 12 hours; delete that
+directory to force a fresh login.
+
 Environment variables:
     CM_ADMIN_URL: Admin panel URL (default: https://admin.creativemerch.com)
     CM_ADMIN_USER: Admin email
     CM_ADMIN_PASS: Admin password
+    CM_ADMIN_API_CAPTURE: Captured API request file (default: admin_api_capture.json)
 """
 
 import pandas as pd
 import os
 import sys
+import json
 import time
+import hashlib
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
 from typing import Optional, Dict, Any
+from urllib.parse import parse_qsl, urlencode
 
 logging.basicConfig(
     level=logging.INFO,
@@ -30,6 +45,52 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Minimum spacing between product submissions (server politeness)
+REQUEST_INTERVAL = 0.05
+
+# Concurrent HTTP submissions when replaying the captured API request
+DEFAULT_WORKERS = 8
+
+# Elements that prove a page is ready (instead of waiting for network idle);
+# only post-login markers - a bare nav also exists on the login page
+DASHBOARD_SELECTOR = '#dashboard, .user-menu'
+PRODUCT_LIST_SELECTOR = 'table.products, .product-list, a:has-text("Add Product")'
+PRODUCT_NAV_SELECTORS = [
+    'a:has-text("Products")',
+    'a:has-text("Catalog")',
+    'a[href*="product"]',
+    '#nav-products',
+    '.menu-products',
+]
+PAGE_TIMEOUT_MS = 15000
+# DASHBOARD_SELECTOR is unverified against the real admin UI, so it only gets a
+# short, best-effort wait and never decides whether a login worked
+DASHBOARD_TIMEOUT_MS = 2000
+
+# Saved login sessions (cookies + localStorage), reused across runs while fresh
+STORAGE_STATE_DIR = Path('~/.cache/cm_admin').expanduser()
+STORAGE_STATE_MAX_AGE = 12 * 3600
+
+# Headers that must not be replayed from a captured request
+SKIP_REPLAY_HEADERS = {'content-length', 'cookie', 'host', 'connection', 'accept-encoding'}
+
+
+class RateLimiter:
+    """Leaky-bucket limiter: at most one call per `interval` seconds, across threads."""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        with self._lock:
+            now = time.monotonic()
+            delay = self._next - now
+            self._next = max(now, self._next) + self.interval
+        if delay > 0:
+            time.sleep(delay)
+
 
 class BrowserImporter:
     def __init__(
@@ -37,17 +98,22 @@ class BrowserImporter:
         admin_url: str = None,
         username: str = None,
         password: str = None,
-        headless: bool = True
+        headless: bool = True,
+        api_capture_path: str = None
     ):
         self.admin_url = admin_url or os.environ.get('CM_ADMIN_URL', 'https://admin.creativemerch.com')
         self.username = username or os.environ.get('CM_ADMIN_USER')
         self.password = password or os.environ.get('CM_ADMIN_PASS')
         self.headless = headless
+        self.api_capture_path = Path(
+            api_capture_path or os.environ.get('CM_ADMIN_API_CAPTURE', 'admin_api_capture.json')
+        )
         self.browser = None
         self.page = None
+        self._captured_requests = []
 
     def start(self):
-        """Start browser and login."""
+        """Start browser and login (reusing a saved session when one is fresh)."""
         try:
             from playwright.sync_api import sync_playwright
         except ImportError:
@@ -56,13 +122,67 @@ class BrowserImporter:
 
         self.playwright = sync_playwright().start()
         self.browser = self.playwright.chromium.launch(headless=self.headless)
+
+        state_path = self._storage_state_path()
+        if self._storage_state_is_fresh(state_path):
+            self.context = self.browser.new_context(storage_state=str(state_path))
+            self.page = self.context.new_page()
+            if self._resume_session():
+                return
+            logger.info("Saved session expired - logging in again")
+            state_path.unlink(missing_ok=True)
+            self.context.close()
+
         self.context = self.browser.new_context()
         self.page = self.context.new_page()
 
         self._login()
+        self._save_storage_state(state_path)
+
+    def _storage_state_path(self) -> Path:
+        """Per-user file for the saved browser session."""
+        user_hash = hashlib.sha256((self.username or '').encode()).hexdigest()[:16]
+        return STORAGE_STATE_DIR / f"{user_hash}.json"
+
+    def _storage_state_is_fresh(self, state_path: Path) -> bool:
+        if not state_path.exists():
+            return False
+        return time.time() - state_path.stat().st_mtime < STORAGE_STATE_MAX_AGE
+
+    def _save_storage_state(self, state_path: Path):
+        """Persist cookies/localStorage so later runs can skip the login form."""
+        state_path.parent.mkdir(parents=True, exist_ok=True)
+        self.context.storage_state(path=str(state_path))
+        state_path.chmod(0o600)
+
+    def _resume_session(self) -> bool:
+        """Open the admin panel with a saved session; True unless redirected to the login page."""
+        logger.info(f"Navigating to {self.admin_url} (saved session)")
+        self.page.goto(self.admin_url)
+        if 'login' in self.page.url.lower():
+            return False
+
+        # A client-side redirect to the login page can still happen while we wait
+        self._wait_for_dashboard()
+        if 'login' in self.page.url.lower():
+            return False
+
+        logger.info("Login skipped (saved session)")
+        return True
+
+    def _wait_for_dashboard(self):
+        """Give the dashboard a moment to render; a missing marker is not an error."""
+        from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
+
+        try:
+            self.page.wait_for_selector(DASHBOARD_SELECTOR, timeout=DASHBOARD_TIMEOUT_MS)
+        except PlaywrightTimeoutError:
+            pass
 
     def _login(self):
         """Login to admin panel."""
+        from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
+
         logger.info(f"Navigating to {self.admin_url}")
         self.page.goto(self.admin_url)
 
@@ -72,12 +192,12 @@ class BrowserImporter:
         self.page.fill('input[name="password"]', self.password)
         self.page.click('input[type="submit"]')
 
-        # Wait for dashboard to load
-        self.page.wait_for_load_state('networkidle')
-
-        # Check if login succeeded
-        if 'login' in self.page.url.lower():
+        # Leaving the login page is the success signal
+        try:
+            self.page.wait_for_url(lambda url: 'login' not in url.lower(), timeout=PAGE_TIMEOUT_MS)
+        except PlaywrightTimeoutError:
             raise Exception("Login failed - check credentials")
+        self._wait_for_dashboard()
 
         logger.info("Login successful")
 
@@ -85,28 +205,24 @@ class BrowserImporter:
         """Navigate to product management section."""
         # TODO: Update selectors based on actual admin UI
         # This is a placeholder - we need to discover the actual navigation
-        logger.info("Navigating to product management...")
+        from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
 
-        # Try common navigation patterns
-        possible_selectors = [
-            'a:has-text("Products")',
-            'a:has-text("Catalog")',
-            'a[href*="product"]',
-            '#nav-products',
-            '.menu-products',
-        ]
+        logger.info("Navigating to product management...")
 
-        for selector in possible_selectors:
-            try:
-                if self.page.locator(selector).count() > 0:
-                    self.page.click(selector)
-                    self.page.wait_for_load_state('networkidle')
-                    logger.info(f"Found navigation via: {selector}")
-                    return
-            except:
-                continue
+        # Try common navigation patterns in a single query
+        nav = self.page.locator(', '.join(PRODUCT_NAV_SELECTORS)).first
+        if nav.count() == 0:
+            logger.warning("Could not find product navigation - may need manual discovery")
+            return
 
-        logger.warning("Could not find product navigation - may need manual discovery")
+        nav_text = nav.inner_text().strip()[:50]
+        nav.click()
+        try:
+            self.page.wait_for_selector(PRODUCT_LIST_SELECTOR, timeout=PAGE_TIMEOUT_MS)
+        except PlaywrightTimeoutError:
+            logger.warning(f"Product list not detected after clicking [{nav_text}]")
+            return
+        logger.info(f"Found navigation via: [{nav_text}]")
 
     def add_product(self, product: Dict[str, Any]) -> bool:
         """Add a single product via the UI."""
@@ -120,6 +236,8 @@ class BrowserImporter:
         # self.page.fill('input[name="item_number"]', product['item_number'])
         # self.page.fill('input[name="name"]', product['product'])
         # ... etc
+        # self.page.click('input[type="submit"]')
+        # self.page.wait_for_selector('.success-toast, .flash-success', timeout=PAGE_TIMEOUT_MS)
 
         # For now, just log what we would do
         logger.info(f"  Would fill: item_number = {product.get('item_number')}")
@@ -128,20 +246,122 @@ class BrowserImporter:
 
         return True
 
-    def import_products(self, df: pd.DataFrame, dry_run: bool = True) -> Dict[str, int]:
+    def _load_api_capture(self) -> Optional[Dict[str, Any]]:
+        """Load the "Add Product" request recorded by discover_ui, if any."""
+        if not self.api_capture_path.exists():
+            return None
+        capture = json.loads(self.api_capture_path.read_text())
+        logger.info(f"Using captured API endpoint: {capture['method']} {capture['url']}")
+        return capture
+
+    def _api_session(self):
+        """Create a pooled HTTP session that shares the browser's login cookies."""
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=16, pool_maxsize=16)
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        for cookie in self.context.cookies():
+            session.cookies.set(cookie['name'], cookie['value'], domain=cookie['domain'], path=cookie['path'])
+        return session
+
+    def _api_add_product(self, session, capture: Dict[str, Any], product: Dict[str, Any]) -> int:
+        """
+        Add a single product by replaying the captured "Add Product" request.
+
+        Captured form fields whose names match a product column are filled from the
+        product; all other fields (hidden inputs, tokens) keep their captured values.
+
+        Redirects are not followed: a successful form POST usually answers with
+        a redirect (Post/Redirect/Get), which counts as added, while an expired
+        login redirects to the login page, which would otherwise end in a 200
+        for a product that was never created.
+
+        Returns:
+            HTTP status code, or None if the replay was redirected to the login
+            page and the product must go through the browser instead
+        """
+        fields = dict(capture['fields'])
+        for name in fields:
+            value = product.get(name)
+            if value is not None and not pd.isna(value):
+                fields[name] = str(value)
+
+        if capture['content_type'].startswith('application/json'):
+            body = json.dumps(fields)
+        else:
+            body = urlencode(fields)
+
+        response = session.request(
+            capture['method'], capture['url'], data=body, headers=capture['headers'],
+            timeout=30, allow_redirects=False
+        )
+        location = response.headers.get('Location', '') if response.is_redirect else ''
+        if 'login' in location.lower():
+            logger.warning(f"API replay for {product.get('item_number')} redirected to {location} "
+                           f"(login expired?)")
+            return None
+        return response.status_code
+
+    def import_products(
+        self,
+        df: pd.DataFrame,
+        dry_run: bool = True,
+        workers: int = DEFAULT_WORKERS
+    ) -> Dict[str, int]:
         """Import all products from DataFrame."""
         stats = {'added': 0, 'skipped': 0, 'errors': 0}
+        products = df.to_dict('records')
 
-        self.navigate_to_products()
-
-        for idx, row in df.iterrows():
-            product = row.to_dict()
-
-            if dry_run:
+        if dry_run:
+            self.navigate_to_products()
+            for product in products:
                 logger.info(f"[DRY RUN] Would add: {product.get('item_number')}")
                 stats['added'] += 1
-                continue
-
+            return stats
+
+        limiter = RateLimiter(REQUEST_INTERVAL)
+        capture = self._load_api_capture()
+        browser_queue = products
+
+        if capture:
+            # HTTP replay is thread-safe, so keep several submissions in flight
+            session = self._api_session()
+            browser_queue = []
+
+            def submit(product):
+                limiter.wait()
+                return self._api_add_product(session, capture, product)
+
+            with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+                futures = {executor.submit(submit, product): product for product in products}
+                for future in as_completed(futures):
+                    product = futures[future]
+                    try:
+                        status = future.result()
+                    except Exception as e:
+                        logger.error(f"Error adding {product.get('item_number')}: {e}")
+                        stats['errors'] += 1
+                        continue
+
+                    if status is None:
+                        browser_queue.append(product)
+                    elif status < 400:
+                        stats['added'] += 1
+                    elif status >= 500:
+                        logger.error(f"Error adding {product.get('item_number')}: API returned HTTP {status}")
+                        stats['errors'] += 1
+                    else:
+                        logger.warning(f"API returned HTTP {status} for {product.get('item_number')}, using browser")
+                        browser_queue.append(product)
+
+        # Playwright's sync API is bound to this thread, so browser adds stay serial
+        if browser_queue:
+            self.navigate_to_products()
+        for product in browser_queue:
+            limiter.wait()
             try:
                 if self.add_product(product):
                     stats['added'] += 1
@@ -151,17 +371,52 @@ class BrowserImporter:
                 logger.error(f"Error adding {product.get('item_number')}: {e}")
                 stats['errors'] += 1
 
-            # Be nice to the server
-            time.sleep(0.5)
-
         return stats
 
+    def _capture_request(self, request):
+        """Record POST requests made while exploring the admin UI."""
+        if request.method != 'POST':
+            return
+        self._captured_requests.append({
+            'method': request.method,
+            'url': request.url,
+            'headers': dict(request.headers),
+            'post_data': request.post_data or '',
+        })
+
+    def _save_api_capture(self):
+        """Persist the most recent product POST seen during discovery."""
+        product_posts = [r for r in self._captured_requests if 'product' in r['url'].lower()]
+        if not product_posts:
+            logger.info("No product POST captured - API shortcut not saved")
+            return
+
+        req = product_posts[-1]
+        content_type = req['headers'].get('content-type', 'application/x-www-form-urlencoded')
+        if content_type.startswith('application/json'):
+            fields = json.loads(req['post_data'] or '{}')
+        else:
+            fields = dict(parse_qsl(req['post_data'], keep_blank_values=True))
+
+        capture = {
+            'method': req['method'],
+            'url': req['url'],
+            'content_type': content_type,
+            'headers': {k: v for k, v in req['headers'].items() if k.lower() not in SKIP_REPLAY_HEADERS},
+            'fields': fields,
+        }
+        self.api_capture_path.write_text(json.dumps(capture, indent=2))
+        logger.info(f"Saved API capture ({len(fields)} fields) to {self.api_capture_path}")
+
     def discover_ui(self):
         """Interactive mode to discover the admin UI structure."""
         logger.info("=== UI Discovery Mode ===")
         logger.info("Navigate manually in the browser. Press Ctrl+C when done.")
         logger.info(f"Current URL: {self.page.url}")
 
+        # Record form/XHR submissions so imports can replay them over HTTP
+        self.page.on("request", self._capture_request)
+
         # Print all links on current page
         links = self.page.locator('a').all()
         logger.info(f"\nFound {len(links)} links on page:")
@@ -185,7 +440,9 @@ class BrowserImporter:
                 pass
 
         # Keep browser open for manual exploration
+        logger.info("Add one product by hand to record the API request used for imports.")
         input("\nPress Enter to close browser...")
+        self._save_api_capture()
 
     def close(self):
         if self.browser:
@@ -204,6 +461,8 @@ def main():
     parser.add_argument('--discover', action='store_true', help='Explore the admin UI')
     parser.add_argument('--visible', action='store_true', help='Show browser window')
     parser.add_argument('--headless', action='store_true', help='Run headless (default)')
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS,
+                        help='Concurrent API submissions (default: %(default)s)')
 
     args = parser.parse_args()
 
@@ -224,7 +483,7 @@ def main():
         df = pd.read_excel(args.input)
         logger.info(f"Loaded {len(df)} products from {args.input}")
 
-        stats = importer.import_products(df, dry_run=not args.commit)
+        stats = importer.import_products(df, dry_run=not args.commit, workers=args.workers)
 
         print(f"\n=== Import {'Preview' if not args.commit else 'Results'} ===")
         print(f"Added:   {stats['added']}")
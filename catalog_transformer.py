@@ -15,9 +15,11 @@ Usage (HTTP - for Pipedream/Railway/Vercel):
     file: <supplier_export.xlsx>
     old_file: <existing_db.xlsx> (optional)
     supplier: illini (optional)
+    format: xlsx | csv | parquet (optional, /transform only)
 
 Requirements:
-    pip install pandas openpyxl xlrd flask gunicorn
+    pip install pandas pyarrow openpyxl xlrd xlsxwriter flask gunicorn
+    pip install python-calamine  # optional, much faster Excel reads
 
 Author: BrandFuse Automation
 """
@@ -30,7 +32,7 @@ import os
 import sys
 import logging
 from pathlib import Path
-from typing import Optional, Tuple, Dict, List
+from typing import Optional, Tuple, Dict, List, Iterator
 from dataclasses import dataclass, field
 
 logging.basicConfig(
@@ -39,6 +41,13 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Arrow-backed strings run .str ops in C++ kernels over one contiguous buffer
+try:
+    import pyarrow  # noqa: F401
+    STRING_DTYPE = pd.StringDtype('pyarrow')
+except ImportError:
+    STRING_DTYPE = pd.StringDtype('python')
+
 
 # =============================================================================
 # CONFIGURATION
@@ -78,6 +87,10 @@ class SageTransformer:
         'logo_scale', 'logo_rotate', 'coord_x', 'coord_y',
     ]
     
+    # Item number normalization patterns (compiled once, shared by all rows)
+    ITEM_X_PATTERN = re.compile(r'\s*[Xx]\s*')
+    WHITESPACE_PATTERN = re.compile(r'\s+')
+    
     def __init__(self, config: Optional[TransformConfig] = None):
         self.config = config or TransformConfig()
     
@@ -92,8 +105,8 @@ class SageTransformer:
         out['product_id'] = np.nan
         
         # Direct mappings with safe column access
-        out['item_number'] = self._safe_col(df, 'ItemNum').apply(self._normalize_item_number)
-        out['product'] = self._safe_col(df, 'Name').apply(lambda x: str(x)[:100] if pd.notna(x) else x)
+        out['item_number'] = self._normalize_item_numbers(self._safe_col(df, 'ItemNum'))
+        out['product'] = self._to_object(self._text_col(df, 'Name').str.slice(0, self.config.char_limits['product']))
         out['colors'] = self._safe_col(df, 'Colors')
         out['decoration_method'] = self._safe_col(df, 'DecorationMethod')
         out['imprint_location'] = self._safe_col(df, 'ImprintLoc')
@@ -101,10 +114,10 @@ class SageTransformer:
         out['setup_price_code'] = self._safe_col(df, 'SetupChgCode')
         
         # Computed fields
-        out['categories'] = df.apply(self._build_categories, axis=1)
-        out['product_desc'] = df.apply(self._build_product_desc, axis=1)
-        out['production_time'] = df.apply(self._build_production_time, axis=1)
-        out['included_decoration'] = df.apply(self._build_included_decoration, axis=1)
+        out['categories'] = self._build_categories(df)
+        out['product_desc'] = self._build_product_desc(df)
+        out['production_time'] = self._build_production_time(df)
+        out['included_decoration'] = self._build_included_decoration(df)
         
         # Quantity columns (0 → NaN)
         for i in range(1, 7):
@@ -115,9 +128,9 @@ class SageTransformer:
             out[f'price_{i}'] = self._safe_col(df, f'Prc{i}').replace(0, np.nan)
         
         # Price code split
-        price_codes = self._safe_col(df, 'PrCode').apply(self._split_price_code)
+        price_codes = self._text_col(df, 'PrCode')
         for i in range(1, 7):
-            out[f'price_code_{i}'] = price_codes.apply(lambda x: x[i-1] if len(x) >= i else np.nan)
+            out[f'price_code_{i}'] = self._to_object(price_codes.str[i - 1])
         
         # Empty/placeholder columns
         for col in ['sizes', 'sizeupcharges', 'addcost', 'addcostprice', 'addcostpricecode',
@@ -134,101 +147,88 @@ class SageTransformer:
         """Safely get column or return NaN series."""
         if col in df.columns:
             return df[col]
-        return pd.Series([np.nan] * len(df))
+        return pd.Series(np.nan, index=df.index, dtype='float64')
+    
+    def _normalize_item_numbers(self, values: pd.Series) -> pd.Series:
+        """Normalize item number formatting for a whole column."""
+        s = values.astype(STRING_DTYPE)
+        s = s.str.replace(self.ITEM_X_PATTERN, ' x ', regex=True)
+        s = s.str.replace(self.WHITESPACE_PATTERN, ' ', regex=True)
+        return s.str.strip().fillna('')
     
     def _normalize_item_number(self, value) -> str:
-        """Normalize item number formatting."""
+        """Normalize a single item number (scalar version of _normalize_item_numbers)."""
         if pd.isna(value):
             return ''
         s = str(value)
-        s = re.sub(r'\s*[Xx]\s*', ' x ', s)
-        s = re.sub(r'\s+', ' ', s)
+        s = self.ITEM_X_PATTERN.sub(' x ', s)
+        s = self.WHITESPACE_PATTERN.sub(' ', s)
         return s.strip()
     
-    def _build_categories(self, row: pd.Series) -> str:
-        """Build category string from Cat1Name and Cat2Name."""
-        parts = []
-        cat1, cat2 = row.get('Cat1Name'), row.get('Cat2Name')
-        if pd.notna(cat1):
-            parts.append(str(cat1))
-        if pd.notna(cat2) and cat2 != cat1:
-            parts.append(str(cat2))
-        return ','.join(parts) if parts else np.nan
+    def _text_col(self, df: pd.DataFrame, col: str) -> pd.Series:
+        """Get column as nullable string dtype (missing values stay missing)."""
+        return self._safe_col(df, col).astype(STRING_DTYPE)
     
-    def _build_product_desc(self, row: pd.Series) -> str:
-        """Build enriched product description."""
-        parts = []
-        
-        desc = row.get('Description')
-        if pd.notna(desc):
-            parts.append(str(desc))
-        
-        imprint_parts = []
-        price_include_clr = row.get('PriceIncludeClr')
-        if pd.notna(price_include_clr) and str(price_include_clr).lower() != 'blank':
-            imprint_parts.append(f"Maximum Imprint Colors\t{str(price_include_clr).title()} Maximum")
-        
-        imp_size1, imp_size2 = row.get('ImprintSize1'), row.get('ImprintSize2')
-        if pd.notna(imp_size1):
-            if pd.notna(imp_size2):
-                imprint_parts.append(f'Imprint Area\t{imp_size1}" x {imp_size2}"')
-            else:
-                imprint_parts.append(f'Imprint Area\t{imp_size1}"')
-        
-        dims = [row.get(f'Dimension{i}') for i in [1, 2, 3]]
-        dims = [d for d in dims if pd.notna(d) and d != 0]
-        if dims:
-            dim_str = '" x "'.join([str(d) for d in dims])
-            imprint_parts.append(f'Item Size\t{dim_str}"')
-        
-        packaging = row.get('Packaging')
-        if pd.notna(packaging):
-            imprint_parts.append(f'Packaging\t{packaging}')
-        
-        if imprint_parts:
-            parts.append('\n'.join(imprint_parts))
-        
-        return '\n\n'.join(parts) if parts else np.nan
+    def _join_parts(self, parts: List[pd.Series], sep: str) -> pd.Series:
+        """Join string Series element-wise, skipping missing parts."""
+        result = parts[0]
+        for part in parts[1:]:
+            result = (result + sep + part).fillna(result).fillna(part)
+        return result
     
-    def _build_production_time(self, row: pd.Series) -> str:
-        """Build production time string."""
-        lo, hi = row.get('ProdTimeLo'), row.get('ProdTimeHi')
-        if pd.isna(lo) or lo == 0:
-            return np.nan
-        if pd.isna(hi) or hi == 0:
-            hi = lo
-        return f"{int(lo)} to {int(hi)} Working Days"
+    def _to_object(self, s: pd.Series) -> pd.Series:
+        """Convert a string Series back to object dtype with NaN for missing."""
+        return s.astype(object).where(s.notna(), np.nan)
     
-    def _build_included_decoration(self, row: pd.Series) -> str:
-        """Build included decoration string."""
-        parts = []
+    def _build_categories(self, df: pd.DataFrame) -> pd.Series:
+        """Build category string from Cat1Name and Cat2Name."""
+        cat1, cat2 = self._safe_col(df, 'Cat1Name'), self._safe_col(df, 'Cat2Name')
+        parts = [cat1.astype(STRING_DTYPE), cat2.mask(cat2.eq(cat1)).astype(STRING_DTYPE)]
+        return self._to_object(self._join_parts(parts, ','))
+    
+    def _build_product_desc(self, df: pd.DataFrame) -> pd.Series:
+        """Build enriched product description."""
+        desc = self._text_col(df, 'Description')
         
-        clr = row.get('PriceIncludeClr')
-        if pd.notna(clr):
-            parts.append('No Imprint' if str(clr).lower() == 'blank' else str(clr).title())
+        clr = self._text_col(df, 'PriceIncludeClr')
+        clr = clr.mask(clr.str.lower().eq('blank').fillna(False))
+        max_colors = 'Maximum Imprint Colors\t' + clr.str.title() + ' Maximum'
         
-        side = row.get('PriceIncludeSide')
-        if pd.notna(side):
-            parts.append(str(side).title())
+        imp_size1, imp_size2 = self._text_col(df, 'ImprintSize1'), self._text_col(df, 'ImprintSize2')
+        imprint_area = 'Imprint Area\t' + self._join_parts([imp_size1 + '"', imp_size2 + '"'], ' x ')
+        imprint_area = imprint_area.where(imp_size1.notna())
         
-        loc = row.get('PriceIncludeLoc')
-        if pd.notna(loc):
-            parts.append(str(loc).title())
+        dims = []
+        for i in [1, 2, 3]:
+            d = self._safe_col(df, f'Dimension{i}')
+            dims.append(d.mask(d.eq(0)).astype(STRING_DTYPE))
+        item_size = 'Item Size\t' + self._join_parts(dims, '" x "') + '"'
         
-        method = row.get('DecorationMethod')
-        if pd.notna(method):
-            parts.append(str(method).title())
+        packaging = 'Packaging\t' + self._text_col(df, 'Packaging')
         
-        result = ' '.join(parts) if parts else np.nan
-        if pd.notna(result):
-            result = result[:60]
-        return result
+        imprint = self._join_parts([max_colors, imprint_area, item_size, packaging], '\n')
+        return self._to_object(self._join_parts([desc, imprint], '\n\n'))
     
-    def _split_price_code(self, code) -> List[str]:
-        """Split price code string into individual codes."""
-        if pd.isna(code):
-            return []
-        return list(str(code))
+    def _build_production_time(self, df: pd.DataFrame) -> pd.Series:
+        """Build production time string."""
+        lo = pd.to_numeric(self._safe_col(df, 'ProdTimeLo'), errors='coerce')
+        hi = pd.to_numeric(self._safe_col(df, 'ProdTimeHi'), errors='coerce')
+        lo = lo.mask(lo.eq(0))
+        hi = hi.mask(hi.eq(0)).fillna(lo)
+        lo_days = np.trunc(lo).astype('Int64').astype(STRING_DTYPE)
+        hi_days = np.trunc(hi).astype('Int64').astype(STRING_DTYPE)
+        return self._to_object(lo_days + ' to ' + hi_days + ' Working Days')
+    
+    def _build_included_decoration(self, df: pd.DataFrame) -> pd.Series:
+        """Build included decoration string."""
+        clr = self._text_col(df, 'PriceIncludeClr')
+        clr = clr.str.title().mask(clr.str.lower().eq('blank').fillna(False), 'No Imprint')
+        parts = [clr] + [
+            self._text_col(df, col).str.title()
+            for col in ['PriceIncludeSide', 'PriceIncludeLoc', 'DecorationMethod']
+        ]
+        result = self._join_parts(parts, ' ').str.slice(0, self.config.char_limits['included_decoration'])
+        return self._to_object(result)
 
 
 # =============================================================================
@@ -257,62 +257,65 @@ class CatalogReconciler:
                 'product', 'colors', 'production_time',
             ]
         
-        # Normalize keys for comparison
-        def norm(x):
-            return str(x).lower().replace(' ', '')
+        old_norm = self._normalize_keys(df_old[self.key_column])
+        new_norm = self._normalize_keys(df_new[self.key_column])
         
-        old_keys = {norm(x): str(x) for x in df_old[self.key_column]}
-        new_keys = {norm(x): str(x) for x in df_new[self.key_column]}
-        
-        old_norm_set = set(old_keys.keys())
-        new_norm_set = set(new_keys.keys())
+        # Pair up the first row per normalized key on each side. Output frames are
+        # built with a single take() each rather than a boolean mask plus copy().
+        cols = [c for c in compare_columns if c in df_old.columns and c in df_new.columns]
+        old = df_old[cols].assign(_k=old_norm.to_numpy()).drop_duplicates('_k')
+        new = df_new[cols].assign(_k=new_norm.to_numpy(), _row=np.arange(len(df_new))).drop_duplicates('_k')
+        merged = old.merge(new, on='_k', how='outer', suffixes=('_old', '_new'), indicator=True)
         
         # Adds
-        add_norms = new_norm_set - old_norm_set
-        add_originals = [new_keys[n] for n in add_norms]
-        adds = df_new[df_new[self.key_column].astype(str).isin(add_originals)].copy()
+        add_keys = merged.loc[merged['_merge'] == 'right_only', '_k']
+        adds = df_new.take(np.flatnonzero(new_norm.isin(add_keys)))
         
         # Deletes
-        del_norms = old_norm_set - new_norm_set
-        del_originals = [old_keys[n] for n in del_norms]
-        deletes = df_old[df_old[self.key_column].astype(str).isin(del_originals)].copy()
+        del_keys = merged.loc[merged['_merge'] == 'left_only', '_k']
+        deletes = df_old.take(np.flatnonzero(old_norm.isin(del_keys)))
         
-        # Updates
-        common_norms = old_norm_set & new_norm_set
-        updates_list = []
+        # Updates: any compared column differs (missing on both sides counts as equal)
+        both = merged[merged['_merge'] == 'both']
+        changed = np.zeros(len(both), dtype=bool)
+        for col in cols:
+            changed |= self._values_differ(both[f'{col}_old'], both[f'{col}_new'])
         
-        for norm_key in common_norms:
-            old_orig = old_keys[norm_key]
-            new_orig = new_keys[norm_key]
-            
-            old_row = df_old[df_old[self.key_column].astype(str) == old_orig].iloc[0]
-            new_row = df_new[df_new[self.key_column].astype(str) == new_orig].iloc[0]
-            
-            changed = False
-            for col in compare_columns:
-                if col in old_row.index and col in new_row.index:
-                    old_val, new_val = old_row[col], new_row[col]
-                    if pd.isna(old_val) and pd.isna(new_val):
-                        continue
-                    if old_val != new_val:
-                        changed = True
-                        break
-            
-            if changed:
-                updates_list.append(new_row)
-        
-        updates = pd.DataFrame(updates_list) if updates_list else pd.DataFrame(columns=df_new.columns)
+        updates = df_new.take(np.sort(both.loc[changed, '_row'].to_numpy(dtype=np.int64)))
         
         logger.info(f"Reconciliation: {len(adds)} adds, {len(updates)} updates, {len(deletes)} deletes")
         return adds, updates, deletes
+    
+    def _values_differ(self, old: pd.Series, new: pd.Series) -> np.ndarray:
+        """Element-wise inequality where missing on both sides counts as equal."""
+        if pd.api.types.is_numeric_dtype(old) and pd.api.types.is_numeric_dtype(new):
+            # Native float comparison; avoids per-element Python dispatch
+            old_vals = old.to_numpy(dtype=np.float64, na_value=np.nan)
+            new_vals = new.to_numpy(dtype=np.float64, na_value=np.nan)
+            return (old_vals != new_vals) & ~(np.isnan(old_vals) & np.isnan(new_vals))
+        
+        old_vals = old.to_numpy(dtype=object, copy=True)
+        new_vals = new.to_numpy(dtype=object, copy=True)
+        old_vals[pd.isna(old_vals)] = None
+        new_vals[pd.isna(new_vals)] = None
+        return old_vals != new_vals
+    
+    def _normalize_keys(self, keys: pd.Series) -> pd.Series:
+        """Normalize keys for comparison (case and whitespace insensitive)."""
+        return keys.astype(str).str.lower().str.replace(' ', '', regex=False)
 
 
 # =============================================================================
 # FILE I/O
 # =============================================================================
 
-def load_file(file_path_or_buffer, filename: str = None) -> pd.DataFrame:
-    """Load Excel or CSV file from path or buffer."""
+def load_file(file_path_or_buffer, filename: str = None, cache: bool = False) -> pd.DataFrame:
+    """
+    Load Excel or CSV file from path or buffer.
+
+    With cache=True, an Excel file loaded from a path goes through
+    read_excel_cached (meant for the --old export, which rarely changes).
+    """
 
     # Determine format
     if filename:
@@ -339,14 +342,157 @@ def load_file(file_path_or_buffer, filename: str = None) -> pd.DataFrame:
         else:
             file_path_or_buffer.seek(0)
             return pd.read_csv(file_path_or_buffer, encoding='utf-8', errors='replace')
+    elif cache and isinstance(file_path_or_buffer, (str, Path)):
+        return read_excel_cached(Path(file_path_or_buffer))
     else:
+        return read_excel_fast(file_path_or_buffer)
+
+
+# Schema metadata key holding "<size>:<mtime_ns>" of the workbook a sidecar was built from
+SOURCE_STAMP_KEY = b'source_stamp'
+
+
+def read_excel_cached(path: Path) -> pd.DataFrame:
+    """
+    Read an Excel file via a Feather sidecar (<file>.feather) kept next to it.
+
+    Repeated runs against the same export (e.g. the --old DB file) load the
+    Arrow copy in milliseconds instead of re-parsing the workbook. The sidecar
+    records the workbook's size and mtime_ns and is rebuilt unless both still
+    match, so a replaced workbook is never served stale (even one with an
+    older mtime, as cp -p or rsync -t leave behind).
+    """
+    cache = path.with_suffix(path.suffix + '.feather')
+    stat = path.stat()
+    stamp = f"{stat.st_size}:{stat.st_mtime_ns}".encode()
+
+    if _feather_source_stamp(cache) == stamp:
+        logger.info(f"Loading cached {cache.name}")
+        return pd.read_feather(cache)
+
+    df = read_excel_fast(path)
+    try:
+        import pyarrow as pa
+        from pyarrow import feather
+
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        table = table.replace_schema_metadata({**(table.schema.metadata or {}), SOURCE_STAMP_KEY: stamp})
+        feather.write_feather(table, str(cache))
+    except Exception as e:
+        # Mixed-type columns or a read-only directory: just skip the cache
+        logger.debug(f"Not caching {path.name}: {e}")
+        cache.unlink(missing_ok=True)
+    return df
+
+
+def _feather_source_stamp(cache: Path) -> Optional[bytes]:
+    """Source stamp stored in a Feather sidecar's schema, or None if missing/unreadable."""
+    try:
+        import pyarrow as pa
+
+        with pa.memory_map(str(cache)) as source:
+            metadata = pa.ipc.open_file(source).schema.metadata or {}
+    except Exception:
+        return None
+    return metadata.get(SOURCE_STAMP_KEY)
+
+
+def read_excel_fast(file_path_or_buffer) -> pd.DataFrame:
+    """Read Excel with the calamine engine when available, else pandas' default."""
+    try:
+        import python_calamine  # noqa: F401
+    except ImportError:
         return pd.read_excel(file_path_or_buffer)
+    return pd.read_excel(file_path_or_buffer, engine='calamine')
+
+
+OUTPUT_FORMATS = {
+    'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+    'csv': 'text/csv',
+    'parquet': 'application/vnd.apache.parquet',
+}
 
 
 def save_to_excel_buffer(df: pd.DataFrame) -> io.BytesIO:
     """Save DataFrame to Excel buffer for HTTP response."""
+    # xlsxwriter serializes noticeably faster than openpyxl. Its constant_memory
+    # mode is not usable here: pandas writes cells column by column and
+    # constant_memory silently drops anything not written in row order.
+    # strings_to_urls is off so URL columns stay plain text, as with openpyxl,
+    # and are not dropped past Excel's 65,530-hyperlinks-per-sheet limit.
+    buffer = io.BytesIO()
+    df.to_excel(buffer, index=False, engine='xlsxwriter',
+                engine_kwargs={'options': {'strings_to_urls': False}})
+    buffer.seek(0)
+    return buffer
+
+
+def _excel_bytes(df: pd.DataFrame) -> bytes:
+    """Serialize DataFrame to XLSX bytes (process pool worker)."""
+    return save_to_excel_buffer(df).getvalue()
+
+
+def iter_excel_files(frames: Dict[str, pd.DataFrame]) -> Iterator[Tuple[str, bytes]]:
+    """Serialize DataFrames to XLSX bytes, yielding (name, bytes) as each finishes."""
+    workers = min(len(frames), os.cpu_count() or 1)
+    if workers < 2:
+        for name, df in frames.items():
+            yield name, _excel_bytes(df)
+        return
+
+    # XLSX serialization is CPU-bound pure Python, so use processes to sidestep the GIL
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(_excel_bytes, df): name for name, df in frames.items()}
+        for future in as_completed(futures):
+            # Drop our reference so a workbook's bytes are freed once consumed
+            name = futures.pop(future)
+            yield name, future.result()
+
+
+class ZipStream(io.RawIOBase):
+    """Write-only, unseekable sink for zipfile whose bytes are drained as they arrive."""
+
+    def __init__(self):
+        super().__init__()
+        self._chunks = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self) -> bytes:
+        data = b''.join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def iter_csv_chunks(df: pd.DataFrame, chunk_rows: int = 10000) -> Iterator[bytes]:
+    """Yield DataFrame as UTF-8 CSV, one block of rows at a time."""
+    for start in range(0, max(len(df), 1), chunk_rows):
+        chunk = df.iloc[start:start + chunk_rows]
+        yield chunk.to_csv(index=False, header=(start == 0)).encode('utf-8')
+
+
+def save_to_buffer(df: pd.DataFrame, fmt: str = 'xlsx') -> io.BytesIO:
+    """Save DataFrame to an in-memory buffer in one of OUTPUT_FORMATS."""
+    if fmt == 'xlsx':
+        return save_to_excel_buffer(df)
+
     buffer = io.BytesIO()
-    df.to_excel(buffer, index=False, engine='openpyxl')
+    if fmt == 'csv':
+        df.to_csv(buffer, index=False, encoding='utf-8')
+    elif fmt == 'parquet':
+        # Arrow needs one type per column; mixed object columns become strings
+        obj_cols = df.select_dtypes(include='object').columns
+        df.astype({col: 'string' for col in obj_cols}).to_parquet(
+            buffer, index=False, engine='pyarrow', compression='zstd'
+        )
+    else:
+        raise ValueError(f"Unsupported output format: {fmt}")
     buffer.seek(0)
     return buffer
 
@@ -389,7 +535,7 @@ Examples:
     
     # Reconcile if old file provided
     if args.old:
-        df_old = load_file(args.old)
+        df_old = load_file(args.old, cache=True)
         reconciler = CatalogReconciler()
         adds, updates, deletes = reconciler.reconcile(df_old, df_clean)
         
@@ -418,7 +564,7 @@ Examples:
 
 def create_app():
     """Create Flask app for HTTP deployment."""
-    from flask import Flask, request, send_file, jsonify
+    from flask import Flask, Response, request, send_file, jsonify
     
     app = Flask(__name__)
     
@@ -441,12 +587,16 @@ def create_app():
         Form data:
             file: Excel or CSV file (required)
             supplier: Supplier code (optional, default: generic)
+            format: xlsx, csv or parquet (optional, default: xlsx)
         """
         if 'file' not in request.files:
             return jsonify({"error": "No file provided"}), 400
         
         file = request.files['file']
         supplier = request.form.get('supplier', 'generic')
+        fmt = request.form.get('format', 'xlsx').lower()
+        if fmt not in OUTPUT_FORMATS:
+            return jsonify({"error": f"Unsupported format '{fmt}' (use {', '.join(OUTPUT_FORMATS)})"}), 400
         
         try:
             df_source = load_file(file.stream, file.filename)
@@ -454,13 +604,22 @@ def create_app():
             transformer = SageTransformer(config)
             df_clean = transformer.transform(df_source)
             
-            buffer = save_to_excel_buffer(df_clean)
+            download_name = f'{supplier}_transformed.{fmt}'
+            if fmt == 'csv':
+                # CSV streams straight to the socket without a full in-memory copy
+                return Response(
+                    iter_csv_chunks(df_clean),
+                    mimetype=OUTPUT_FORMATS[fmt],
+                    headers={'Content-Disposition': f'attachment; filename={download_name}'}
+                )
+            
+            buffer = save_to_buffer(df_clean, fmt)
             
             return send_file(
                 buffer,
-                mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+                mimetype=OUTPUT_FORMATS[fmt],
                 as_attachment=True,
-                download_name=f'{supplier}_transformed.xlsx'
+                download_name=download_name
             )
         except Exception as e:
             logger.exception("Transform failed")
@@ -498,26 +657,29 @@ def create_app():
             reconciler = CatalogReconciler()
             adds, updates, deletes = reconciler.reconcile(df_old, df_clean)
             
-            # Create ZIP with all outputs
-            zip_buffer = io.BytesIO()
-            with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zf:
-                # Main transformed file
-                zf.writestr(f'{supplier}_transformed.xlsx', save_to_excel_buffer(df_clean).getvalue())
-                
-                if len(adds) > 0:
-                    zf.writestr(f'{supplier}_ADDS.xlsx', save_to_excel_buffer(adds).getvalue())
-                if len(updates) > 0:
-                    zf.writestr(f'{supplier}_UPDATES.xlsx', save_to_excel_buffer(updates).getvalue())
-                if len(deletes) > 0:
-                    zf.writestr(f'{supplier}_DELETES.xlsx', save_to_excel_buffer(deletes).getvalue())
+            frames = {'transformed': df_clean}
+            for name, frame in [('ADDS', adds), ('UPDATES', updates), ('DELETES', deletes)]:
+                if len(frame) > 0:
+                    frames[name] = frame
             
-            zip_buffer.seek(0)
+            # Stream the ZIP: each workbook is sent as soon as it is serialized
+            # and released once written, instead of building the whole archive
+            def generate():
+                sink = ZipStream()
+                try:
+                    with zipfile.ZipFile(sink, 'w', zipfile.ZIP_DEFLATED) as zf:
+                        for name, data in iter_excel_files(frames):
+                            zf.writestr(f'{supplier}_{name}.xlsx', data)
+                            yield sink.drain()
+                    yield sink.drain()
+                except Exception:
+                    logger.exception("Reconcile output failed")
+                    raise
             
-            return send_file(
-                zip_buffer,
+            return Response(
+                generate(),
                 mimetype='application/zip',
-                as_attachment=True,
-                download_name=f'{supplier}_catalog_sync.zip'
+                headers={'Content-Disposition': f'attachment; filename={supplier}_catalog_sync.zip'}
             )
         except Exception as e:
             logger.exception("Reconcile failed")
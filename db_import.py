@@ -19,13 +19,19 @@ Environment variables:
     CM_DB_USER: Database username
     CM_DB_PASS: Database password
     CM_DB_NAME: Database name (default: cm_v3_production)
+
+Parallel writes (--workers N) use pymysql-pool when it is installed:
+    pip install pymysql-pool
 """
 
 import pandas as pd
 import os
 import sys
 import logging
-from typing import Optional, List, Dict, Any
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Optional, List, Dict, Any, Tuple
 
 logging.basicConfig(
     level=logging.INFO,
@@ -69,6 +75,44 @@ COLUMN_MAPPING = {
     'price_code_6': 'price_code_6',
 }
 
+# Rows per executemany() call; PyMySQL folds each batch into one multi-row INSERT
+INSERT_BATCH_SIZE = 1000
+
+# Keys per IN (...) list when checking which products already exist
+EXISTS_CHUNK_SIZE = 5000
+
+# Connection pool settings used when importing with more than one worker
+POOL_MAX_SIZE = 25
+POOL_PRE_CREATE = 5
+POOL_CON_LIFETIME = 600  # seconds; keep below the server's wait_timeout
+
+# Upper bound for one folded INSERT statement (keep below the server's max_allowed_packet)
+MAX_STATEMENT_BYTES = 16 * 1024 * 1024
+
+
+@lru_cache(maxsize=None)
+def build_upsert_sql(columns: Tuple[str, ...]) -> str:
+    """
+    Build a parameterized INSERT ... ON DUPLICATE KEY UPDATE for the given columns.
+
+    Relies on a unique index on item_number. The VALUES tuple must be followed only
+    by the ON DUPLICATE KEY UPDATE clause so PyMySQL's executemany() can fold a
+    batch into a single multi-row INSERT. Cached per column set.
+    """
+    db_cols = [COLUMN_MAPPING[col] for col in columns]
+    col_list = ', '.join(f'`{c}`' for c in db_cols)
+    placeholders = ', '.join(['%s'] * len(db_cols))
+    updates = ', '.join(f'`{c}`=VALUES(`{c}`)' for c in db_cols if c != 'item_number')
+    return (
+        f"INSERT INTO `{PRODUCTS_TABLE}` ({col_list}) VALUES ({placeholders}) "
+        f"ON DUPLICATE KEY UPDATE {updates}"
+    )
+
+
+def fold_key(item_number: Any) -> str:
+    """Fold an item_number the way its collation compares it: case-insensitive, trailing spaces ignored."""
+    return str(item_number).rstrip(' ').casefold()
+
 
 class DatabaseImporter:
     def __init__(
@@ -77,14 +121,17 @@ class DatabaseImporter:
         port: int = None,
         user: str = None,
         password: str = None,
-        database: str = None
+        database: str = None,
+        workers: int = 1
     ):
         self.host = host or os.environ.get('CM_DB_HOST', '127.0.0.1')
         self.port = port or int(os.environ.get('CM_DB_PORT', 3306))
         self.user = user or os.environ.get('CM_DB_USER')
         self.password = password or os.environ.get('CM_DB_PASS')
         self.database = database or os.environ.get('CM_DB_NAME', 'cm_v3_production')
+        self.workers = max(1, workers)
         self.connection = None
+        self.pool = None
 
     def connect(self):
         """Establish database connection."""
@@ -95,16 +142,42 @@ class DatabaseImporter:
             sys.exit(1)
 
         logger.info(f"Connecting to {self.host}:{self.port}/{self.database}")
-        self.connection = pymysql.connect(
+        self.connection = pymysql.connect(**self._connect_kwargs(pymysql))
+        logger.info("Connected successfully")
+
+        if self.workers > 1:
+            self._create_pool(pymysql)
+
+    def _connect_kwargs(self, pymysql, local_infile: bool = False) -> Dict[str, Any]:
+        return dict(
             host=self.host,
             port=self.port,
             user=self.user,
             password=self.password,
             database=self.database,
             charset='utf8mb4',
-            cursorclass=pymysql.cursors.DictCursor
+            cursorclass=pymysql.cursors.DictCursor,
+            local_infile=local_infile
         )
-        logger.info("Connected successfully")
+
+    def _create_pool(self, pymysql):
+        """Create a connection pool so parallel writers reuse warm connections."""
+        try:
+            from pymysqlpool import ConnectionPool
+        except ImportError:
+            logger.warning("pymysql-pool not installed, writing with a single connection. "
+                           "Run: pip install pymysql-pool")
+            return
+
+        self.pool = ConnectionPool(
+            size=self.workers,
+            maxsize=max(self.workers, POOL_MAX_SIZE),
+            pre_create_num=min(self.workers, POOL_PRE_CREATE),
+            con_lifetime=POOL_CON_LIFETIME,
+            autocommit=False,
+            **self._connect_kwargs(pymysql)
+        )
+        logger.info(f"Connection pool ready for {self.workers} workers")
 
     def discover_schema(self) -> Dict[str, List[str]]:
         """Discover relevant tables and columns."""
@@ -136,61 +209,216 @@ class DatabaseImporter:
         """Import products from DataFrame."""
         stats = {'inserted': 0, 'updated': 0, 'skipped': 0, 'errors': 0}
 
+        columns = [col for col in COLUMN_MAPPING if col in df.columns]
+        sql = build_upsert_sql(tuple(columns))
+        key_pos = columns.index('item_number')
+        values = df[columns].astype(object).where(df[columns].notna(), None)
+
+        with self.connection.cursor() as cursor:
+            cursor.max_stmt_length = MAX_STATEMENT_BYTES
+            existing = self._fetch_existing_keys(cursor, df['item_number'].astype(str).tolist())
+            inserts, updates = [], []
+
+            for row in values.itertuples(index=False, name=None):
+                item_number = row[key_pos]
+                if str(item_number) in existing:
+                    if dry_run:
+                        logger.debug(f"Would update: {item_number}")
+                    updates.append(row)
+                else:
+                    if dry_run:
+                        logger.debug(f"Would insert: {item_number}")
+                    inserts.append(row)
+
+            stats['inserted'] = len(inserts)
+            stats['updated'] = len(updates)
+
+            if not dry_run and self.pool is None:
+                for bucket, rows in (('inserted', inserts), ('updated', updates)):
+                    failed = self._write_batches(cursor, sql, rows, key_pos)
+                    stats[bucket] -= failed
+                    stats['errors'] += failed
+                self.connection.commit()
+
+        if not dry_run and self.pool is not None:
+            for bucket, rows in (('inserted', inserts), ('updated', updates)):
+                failed = self._write_sharded(sql, rows, key_pos)
+                stats[bucket] -= failed
+                stats['errors'] += failed
+
+        return stats
+
+    def import_products_bulk(self, df: pd.DataFrame) -> Dict[str, int]:
+        """
+        Load products with LOAD DATA LOCAL INFILE, for the initial load of a full feed.
+
+        New rows are streamed from a temporary tab-separated file in one transaction.
+        Rows whose item_number already exists (or repeats within df) are left out
+        and counted as skipped; use import_products() to update them. Requires
+        local_infile=ON on the server; the client side is enabled only on a
+        dedicated connection opened for the load.
+
+        Because the loaded keys are known to be new and distinct, unique and
+        foreign key checks are switched off for the load, so InnoDB can defer
+        secondary index maintenance instead of probing it per row.
+        """
+        stats = {'inserted': 0, 'updated': 0, 'skipped': 0, 'errors': 0}
+
+        columns = [col for col in COLUMN_MAPPING if col in df.columns]
+        col_list = ', '.join(f'`{COLUMN_MAPPING[col]}`' for col in columns)
+
+        keys = df['item_number'].astype(str)
         with self.connection.cursor() as cursor:
-            for idx, row in df.iterrows():
+            existing = self._fetch_existing_keys(cursor, keys.tolist())
+        # With unique_checks off a key the server considers equal could slip in,
+        # so compare as the item_number collation does: case-insensitive, trailing
+        # spaces ignored.
+        folded = keys.str.rstrip(' ').str.casefold()
+        existing = {fold_key(key) for key in existing}
+        new_rows = df[~folded.isin(existing) & ~folded.duplicated()]
+
+        with tempfile.NamedTemporaryFile(
+            'w', suffix='.tsv', encoding='utf-8', newline='', delete=False
+        ) as f:
+            self._write_load_file(new_rows[columns], f)
+            path = f.name
+
+        import pymysql
+        connection = None
+        try:
+            connection = pymysql.connect(**self._connect_kwargs(pymysql, local_infile=True))
+            with connection.cursor() as cursor:
+                cursor.execute("SET unique_checks = 0")
+                cursor.execute("SET foreign_key_checks = 0")
                 try:
-                    # Check if product exists
                     cursor.execute(
-                        f"SELECT id FROM `{PRODUCTS_TABLE}` WHERE item_number = %s",
-                        (row['item_number'],)
+                        f"LOAD DATA LOCAL INFILE %s IGNORE INTO TABLE `{PRODUCTS_TABLE}` "
+                        f"CHARACTER SET utf8mb4 "
+                        f"FIELDS TERMINATED BY '\\t' ENCLOSED BY '' ESCAPED BY '\\\\' "
+                        f"LINES TERMINATED BY '\\n' ({col_list})",
+                        (path,)
                     )
-                    existing = cursor.fetchone()
-
-                    if existing:
-                        if dry_run:
-                            logger.debug(f"Would update: {row['item_number']}")
-                        else:
-                            # TODO: Build UPDATE query based on actual schema
-                            pass
-                        stats['updated'] += 1
-                    else:
-                        if dry_run:
-                            logger.debug(f"Would insert: {row['item_number']}")
-                        else:
-                            # TODO: Build INSERT query based on actual schema
-                            pass
-                        stats['inserted'] += 1
-
-                except Exception as e:
-                    logger.error(f"Error processing {row.get('item_number', idx)}: {e}")
-                    stats['errors'] += 1
-
-            if not dry_run:
-                self.connection.commit()
-
+                    stats['inserted'] = cursor.rowcount
+                    connection.commit()
+                except Exception:
+                    connection.rollback()
+                    raise
+        finally:
+            if connection is not None:
+                connection.close()
+            os.unlink(path)
+
+        stats['skipped'] = len(df) - stats['inserted']
         return stats
 
+    def _write_load_file(self, df: pd.DataFrame, f):
+        """Write df in LOAD DATA's default text format: tab-separated, backslash-escaped, NULL as \\N."""
+        if df.empty:
+            return
+        fields = []
+        for col in df.columns:
+            values = df[col].astype(str)
+            if not pd.api.types.is_numeric_dtype(df[col]):
+                values = (
+                    values.str.replace('\\', '\\\\', regex=False)
+                    .str.replace('\t', '\\t', regex=False)
+                    .str.replace('\n', '\\n', regex=False)
+                    .str.replace('\r', '\\r', regex=False)
+                )
+            fields.append(values.mask(df[col].isna(), '\\N'))
+        lines = fields[0].str.cat(fields[1:], sep='\t')
+        f.write('\n'.join(lines))
+        f.write('\n')
+
+    def _write_batches(self, cursor, sql: str, rows: List[tuple], key_pos: int, connection=None) -> int:
+        """
+        Write rows with executemany() in INSERT_BATCH_SIZE batches; return the failed row count.
+
+        If connection is given, each batch is committed on its own, so a deadlock
+        (which rolls back the whole transaction) only loses the batch it hit.
+        """
+        errors = 0
+        for start in range(0, len(rows), INSERT_BATCH_SIZE):
+            batch = rows[start:start + INSERT_BATCH_SIZE]
+            try:
+                cursor.executemany(sql, batch)
+                if connection is not None:
+                    connection.commit()
+            except Exception as e:
+                logger.error(f"Error writing {len(batch)} rows starting at {batch[0][key_pos]}: {e}")
+                errors += len(batch)
+                if connection is not None:
+                    connection.rollback()
+        return errors
+
+    def _write_sharded(self, sql: str, rows: List[tuple], key_pos: int) -> int:
+        """
+        Split rows into one shard per worker by folded item_number hash and write each
+        shard on its own pooled connection, committing per batch. Keys the collation
+        treats as equal land on the same shard, so no two workers ever touch the same row.
+        """
+        shards = [[] for _ in range(self.workers)]
+        for row in rows:
+            shards[hash(fold_key(row[key_pos])) % self.workers].append(row)
+
+        def write_shard(shard: List[tuple]) -> int:
+            with self.pool.get_connection(retry_num=3, retry_interval=1, pre_ping=True) as conn:
+                with conn.cursor() as cursor:
+                    cursor.max_stmt_length = MAX_STATEMENT_BYTES
+                    return self._write_batches(cursor, sql, shard, key_pos, connection=conn)
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            return sum(executor.map(write_shard, [shard for shard in shards if shard]))
+
+    def _fetch_existing_keys(self, cursor, keys: List[str]) -> set:
+        """Return the subset of keys already present in the products table."""
+        existing = set()
+        for start in range(0, len(keys), EXISTS_CHUNK_SIZE):
+            chunk = keys[start:start + EXISTS_CHUNK_SIZE]
+            placeholders = ', '.join(['%s'] * len(chunk))
+            cursor.execute(
+                f"SELECT item_number FROM `{PRODUCTS_TABLE}` WHERE item_number IN ({placeholders})",
+                chunk
+            )
+            existing.update(str(row['item_number']) for row in cursor.fetchall())
+        return existing
+
     def close(self):
         if self.connection:
             self.connection.close()
+        self.pool = None
+
+
+def load_products(path: str) -> pd.DataFrame:
+    """Load transformed products from .parquet, .csv or Excel."""
+    ext = os.path.splitext(path)[1].lower()
+    if ext == '.parquet':
+        return pd.read_parquet(path)
+    if ext == '.csv':
+        return pd.read_csv(path)
+    return pd.read_excel(path)
 
 
 def main():
     import argparse
 
     parser = argparse.ArgumentParser(description='Import products to Creative Merchandise database')
-    parser.add_argument('input', help='Transformed Excel file to import')
+    parser.add_argument('input', help='Transformed file to import (.xlsx, .parquet or .csv)')
     parser.add_argument('--dry-run', action='store_true', help='Show what would be done without making changes')
     parser.add_argument('--commit', action='store_true', help='Actually commit changes to database')
     parser.add_argument('--discover', action='store_true', help='Just discover and print database schema')
     parser.add_argument('--supplier-id', type=int, help='Supplier ID for the products')
+    parser.add_argument('--bulk', action='store_true',
+                        help='With --commit, load new products via LOAD DATA LOCAL INFILE (initial load)')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='Parallel writer connections (uses pymysql-pool; default: 1)')
 
     args = parser.parse_args()
 
     if not args.dry_run and not args.commit and not args.discover:
         parser.error("Must specify --dry-run, --commit, or --discover")
 
-    importer = DatabaseImporter()
+    importer = DatabaseImporter(workers=args.workers)
 
     try:
         importer.connect()
@@ -204,14 +432,17 @@ def main():
                     print(f"  - {col}")
             return
 
-        df = pd.read_excel(args.input)
+        df = load_products(args.input)
         logger.info(f"Loaded {len(df)} products from {args.input}")
 
-        stats = importer.import_products(
-            df,
-            dry_run=not args.commit,
-            supplier_id=args.supplier_id
-        )
+        if args.bulk and args.commit:
+            stats = importer.import_products_bulk(df)
+        else:
+            stats = importer.import_products(
+                df,
+                dry_run=not args.commit,
+                supplier_id=args.supplier_id
+            )
 
         print(f"\n=== Import {'Preview' if not args.commit else 'Results'} ===")
         print(f"Inserted: {stats['inserted']}")
@@ -18,9 +18,12 @@ Requires SSH access to determine:
 
 import os
 import sys
+import json
+import asyncio
 import logging
+import shutil
 import hashlib
-import requests
+import httpx
 from pathlib import Path
 from typing import Optional, List, Dict, Tuple
 from dataclasses import dataclass
@@ -33,6 +36,9 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Bytes per read when streaming an image body to disk
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+
 
 @dataclass
 class ImageConfig:
@@ -56,25 +62,101 @@ class ImageConfig:
     thumbnail_size: Tuple[int, int] = (300, 300)
     quality: int = 85
 
+    # Downloading
+    max_concurrent_downloads: int = 64
+    revalidate: bool = False  # conditional GET for images already on disk
+
 
 class ImageDownloader:
-    """Downloads images from URLs."""
+    """Downloads images from URLs concurrently over a shared httpx.AsyncClient."""
+
+    HEADERS = {'User-Agent': 'Mozilla/5.0 (compatible; ProductImageBot/1.0)'}
+
+    # Validators (ETag / Last-Modified) per blob key, kept in the download dir
+    META_FILE = 'meta.json'
 
     def __init__(self, config: ImageConfig):
         self.config = config
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (compatible; ProductImageBot/1.0)'
-        })
+        self._pending: Dict[Path, asyncio.Task] = {}
+        self._fetches: Dict[Path, asyncio.Task] = {}
+        self._meta: Dict[str, Dict[str, str]] = {}
 
         # Ensure download directory exists
         Path(config.download_dir).mkdir(parents=True, exist_ok=True)
 
-    def download(self, url: str, item_number: str, image_type: str = "main") -> Optional[str]:
+    def _client(self) -> httpx.AsyncClient:
+        """Create the pooled client; HTTP/2 multiplexing is used when h2 is installed."""
+        try:
+            import h2  # noqa: F401
+            http2 = True
+        except ImportError:
+            http2 = False
+
+        limit = self.config.max_concurrent_downloads
+        return httpx.AsyncClient(
+            http2=http2,
+            headers=self.HEADERS,
+            timeout=30,
+            follow_redirects=True,
+            limits=httpx.Limits(max_connections=limit, max_keepalive_connections=limit // 2),
+        )
+
+    def _extension(self, url: str) -> str:
+        """Determine extension from URL."""
+        return Path(urlparse(url).path).suffix or '.jpg'
+
+    def _local_path(self, url: str, item_number: str, image_type: str) -> Path:
+        """Human-readable filename for an image: {item_number}_{image_type}{ext}."""
+        safe_type = image_type.replace(' ', '_').replace('/', '-')
+        return Path(self.config.download_dir) / f"{item_number}_{safe_type}{self._extension(url)}"
+
+    def _blob_path(self, url: str) -> Path:
+        """
+        Content-addressed location for a URL: blobs/{key[:2]}/{key}{ext}.
+
+        SKUs and colors that share a supplier URL share one blob, so it is
+        downloaded and stored once.
+        """
+        key = hashlib.blake2b(url.encode(), digest_size=16).hexdigest()
+        return Path(self.config.download_dir) / 'blobs' / key[:2] / f"{key}{self._extension(url)}"
+
+    def _link(self, blob_path: Path, local_path: Path):
+        """Expose a blob under its readable name (hard link; copy if linking fails)."""
+        if local_path.exists() and os.path.samefile(blob_path, local_path):
+            return
+        tmp_path = local_path.with_name(local_path.name + '.link')
+        tmp_path.unlink(missing_ok=True)
+        try:
+            os.link(blob_path, tmp_path)
+        except OSError:
+            shutil.copyfile(blob_path, tmp_path)
+        os.replace(tmp_path, local_path)
+
+    def _load_meta(self):
+        meta_path = Path(self.config.download_dir) / self.META_FILE
+        try:
+            self._meta = json.loads(meta_path.read_text())
+        except (OSError, ValueError):
+            self._meta = {}
+
+    def _save_meta(self):
+        meta_path = Path(self.config.download_dir) / self.META_FILE
+        tmp_path = meta_path.with_name(meta_path.name + '.tmp')
+        tmp_path.write_text(json.dumps(self._meta))
+        os.replace(tmp_path, meta_path)
+
+    async def download(
+        self,
+        client: httpx.AsyncClient,
+        url: str,
+        item_number: str,
+        image_type: str = "main"
+    ) -> Optional[str]:
         """
         Download image from URL.
 
         Args:
+            client: Shared async HTTP client
             url: Image URL
             item_number: Product item number (for filename)
             image_type: "main", "blank", or color name like "Navy Blue"
@@ -85,64 +167,105 @@ class ImageDownloader:
         if not url or pd.isna(url):
             return None
 
-        try:
-            # Determine extension from URL
-            parsed = urlparse(url)
-            ext = Path(parsed.path).suffix or '.jpg'
-
-            # Create safe filename
-            safe_type = image_type.replace(' ', '_').replace('/', '-')
-            filename = f"{item_number}_{safe_type}{ext}"
-            local_path = Path(self.config.download_dir) / filename
+        local_path = self._local_path(url, item_number, image_type)
 
-            # Skip if already downloaded
-            if local_path.exists():
-                logger.debug(f"Already downloaded: {filename}")
-                return str(local_path)
-
-            # Download
-            response = self.session.get(url, timeout=30)
-            response.raise_for_status()
+        # Skip if already downloaded (unless revalidating against the server)
+        if local_path.exists() and not self.config.revalidate:
+            logger.debug(f"Already downloaded: {local_path.name}")
+            return str(local_path)
 
-            with open(local_path, 'wb') as f:
-                f.write(response.content)
+        # The first row to claim a filename decides its image
+        if local_path not in self._pending:
+            self._pending[local_path] = asyncio.ensure_future(self._materialize(client, url, local_path))
+        return await self._pending[local_path]
+
+    async def _materialize(self, client: httpx.AsyncClient, url: str, local_path: Path) -> Optional[str]:
+        # Rows sharing a URL share one blob and one in-flight download
+        blob_path = self._blob_path(url)
+        if not blob_path.exists() or self.config.revalidate:
+            if blob_path not in self._fetches:
+                self._fetches[blob_path] = asyncio.ensure_future(self._fetch(client, url, blob_path))
+            if not await self._fetches[blob_path]:
+                return None
+        else:
+            logger.debug(f"Reusing blob for {local_path.name}")
+
+        self._link(blob_path, local_path)
+        return str(local_path)
+
+    async def _fetch(self, client: httpx.AsyncClient, url: str, blob_path: Path) -> bool:
+        """
+        Stream url into blob_path in DOWNLOAD_CHUNK_SIZE pieces.
 
-            logger.info(f"Downloaded: {filename} ({len(response.content)} bytes)")
-            return str(local_path)
+        The body goes to a .part file that is renamed into place once complete,
+        so an interrupted run never leaves a truncated blob behind that later
+        runs would treat as already downloaded. If the blob already exists, the
+        request is conditional on its stored ETag / Last-Modified and a 304
+        keeps the blob as is.
+        """
+        key = blob_path.stem
+        headers = {}
+        if blob_path.exists():
+            validators = self._meta.get(key, {})
+            if 'etag' in validators:
+                headers['If-None-Match'] = validators['etag']
+            if 'last_modified' in validators:
+                headers['If-Modified-Since'] = validators['last_modified']
+
+        part_path = blob_path.with_name(blob_path.name + '.part')
+        try:
+            blob_path.parent.mkdir(parents=True, exist_ok=True)
+            async with client.stream('GET', url, headers=headers) as response:
+                if response.status_code == 304:
+                    logger.debug(f"Not modified: {url}")
+                    return True
+                response.raise_for_status()
+                with open(part_path, 'wb') as f:
+                    async for chunk in response.aiter_bytes(DOWNLOAD_CHUNK_SIZE):
+                        f.write(chunk)
+            os.replace(part_path, blob_path)
+
+            validators = {
+                'etag': response.headers.get('ETag'),
+                'last_modified': response.headers.get('Last-Modified'),
+            }
+            self._meta[key] = {k: v for k, v in validators.items() if v}
+
+            logger.info(f"Downloaded: {url} ({response.headers.get('Content-Length', '?')} bytes)")
+            return True
 
         except Exception as e:
             logger.error(f"Failed to download {url}: {e}")
-            return None
+            part_path.unlink(missing_ok=True)
+            return False
 
-    def download_product_images(self, row: pd.Series) -> Dict[str, str]:
+    async def download_product_images(
+        self,
+        client: httpx.AsyncClient,
+        item_number: str,
+        main_url: Optional[str],
+        blank_url: Optional[str] = None
+    ) -> Dict[str, str]:
         """
         Download all images for a product.
 
-        Expects columns:
-            - item_number
-            - image_url (main image)
-            - blank_image_url (optional)
-            - colors (comma-separated, for future color-specific images)
+        Args:
+            client: Shared async HTTP client
+            item_number: Product item number
+            main_url: Main image URL
+            blank_url: Blank (undecorated) image URL, optional
 
         Returns:
             Dict mapping image_type to local_path
         """
         images = {}
-        item_number = str(row.get('item_number', 'unknown'))
-
-        # Main image
-        main_url = row.get('image_url') or row.get('ImageURL') or row.get('NewPictureURL')
-        if main_url:
-            path = self.download(main_url, item_number, "main")
+        wanted = [('main', main_url), ('blank', blank_url)]
+        paths = await asyncio.gather(*(
+            self.download(client, url, item_number, image_type) for image_type, url in wanted
+        ))
+        for (image_type, _), path in zip(wanted, paths):
             if path:
-                images['main'] = path
-
-        # Blank image (undecorated)
-        blank_url = row.get('blank_image_url') or row.get('NewBlankPictureURL')
-        if blank_url:
-            path = self.download(blank_url, item_number, "blank")
-            if path:
-                images['blank'] = path
+                images[image_type] = path
 
         # Future: Color-specific images if URLs are provided
         # colors = row.get('colors', '').split(',')
@@ -155,6 +278,33 @@ class ImageDownloader:
 
         return images
 
+    def download_all(self, products: List[Tuple[str, Optional[str], Optional[str]]]) -> List[Dict[str, str]]:
+        """
+        Download images for many products at once.
+
+        Args:
+            products: (item_number, main_url, blank_url) per product
+
+        Returns:
+            One {image_type: local_path} dict per product, in input order
+        """
+        return asyncio.run(self._download_all(products))
+
+    async def _download_all(self, products) -> List[Dict[str, str]]:
+        semaphore = asyncio.Semaphore(self.config.max_concurrent_downloads)
+
+        async def bounded(client, product):
+            async with semaphore:
+                return await self.download_product_images(client, *product)
+
+        self._pending, self._fetches = {}, {}
+        self._load_meta()
+        try:
+            async with self._client() as client:
+                return await asyncio.gather(*(bounded(client, product) for product in products))
+        finally:
+            self._save_meta()
+
 
 class ImageUploader:
     """Uploads images to server or S3."""
@@ -237,12 +387,19 @@ class ProductImageProcessor:
         """
         results = {}
 
-        for idx, row in df.iterrows():
-            item_number = str(row.get('item_number', f'row_{idx}'))
+        if 'item_number' in df.columns:
+            item_numbers = df['item_number'].astype(str)
+        else:
+            item_numbers = pd.Series([f'row_{idx}' for idx in df.index], index=df.index)
 
-            # Download images
-            images = self.downloader.download_product_images(row)
+        # First non-empty URL column wins, as before
+        main_urls = self._first_url(df, ['image_url', 'ImageURL', 'NewPictureURL'])
+        blank_urls = self._first_url(df, ['blank_image_url', 'NewBlankPictureURL'])
 
+        products = list(zip(item_numbers, main_urls, blank_urls))
+        all_images = self.downloader.download_all(products)
+
+        for (item_number, _, _), images in zip(products, all_images):
             if not download_only:
                 # Upload to server
                 for img_type, local_path in images.items():
@@ -255,6 +412,15 @@ class ProductImageProcessor:
         logger.info(f"Processed images for {len(results)} products")
         return results
 
+    def _first_url(self, df: pd.DataFrame, columns: List[str]) -> List[Optional[str]]:
+        """Coalesce URL columns left to right, skipping missing and empty values."""
+        urls = pd.Series(None, index=df.index, dtype=object)
+        for col in columns:
+            if col in df.columns:
+                values = df[col].where(df[col].notna() & df[col].astype(str).ne(''))
+                urls = urls.fillna(values)
+        return urls.where(urls.notna(), None).tolist()
+
 
 def main():
     import argparse
@@ -265,10 +431,12 @@ def main():
     parser.add_argument('--upload-to-server', action='store_true', help='Upload via SFTP')
     parser.add_argument('--upload-to-s3', action='store_true', help='Upload to S3')
     parser.add_argument('--download-dir', default='/tmp/product_images', help='Local download directory')
+    parser.add_argument('--revalidate', action='store_true',
+                        help='Re-check images already on disk with conditional GETs (ETag / Last-Modified)')
 
     args = parser.parse_args()
 
-    config = ImageConfig(download_dir=args.download_dir)
+    config = ImageConfig(download_dir=args.download_dir, revalidate=args.revalidate)
     processor = ProductImageProcessor(config)
 
     # Load products
@@ -9,6 +9,9 @@ Usage:
     python replink_transformer.py replink_catalog.txt output.xlsx
     python replink_transformer.py replink_catalog.txt output.xlsx --old existing_products.xlsx
 
+    # Parquet outputs (for db_import.py) - picked from the output extension
+    python replink_transformer.py replink_catalog.txt output.parquet
+
 The Replink feed is pipe-delimited with these key columns:
     - BrandName, ItemNumber, ShortName, SalesCopy
     - MSRP, MAP, UserPrice, JobberPrice, DistributorPrice
@@ -16,7 +19,7 @@ The Replink feed is pipe-delimited with these key columns:
     - ImageURL
     - Features 1-18
 
-Output includes:
+Output includes (.xlsx or .parquet, matching the output path):
     - enabled_products.xlsx: Products with inventory > 0
     - disabled_products.xlsx: Products with inventory = 0
     - adds/updates/deletes if --old provided
@@ -24,6 +27,7 @@ Output includes:
 
 import pandas as pd
 import numpy as np
+import codecs
 import csv
 import io
 import os
@@ -39,6 +43,20 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Arrow-backed strings run .str ops in C++ kernels over one contiguous buffer
+try:
+    import pyarrow  # noqa: F401
+    STRING_DTYPE = pd.StringDtype('pyarrow')
+except ImportError:
+    STRING_DTYPE = pd.StringDtype('python')
+
+# Rows per chunk when streaming a feed through transform
+CHUNK_SIZE = 50000
+
+# Write URLs as plain strings: skips per-cell URL matching, and xlsxwriter drops
+# any URL past Excel's 65,530-hyperlinks-per-sheet limit
+XLSX_ENGINE_KWARGS = {'options': {'strings_to_urls': False}}
+
 
 @dataclass
 class ReplinkConfig:
@@ -74,61 +92,108 @@ class ReplinkTransformer:
         'FOBZip': 'fob_zip',
     }
 
+    BULLET = '• '
+
+    PRICE_COLUMNS = ['MSRP', 'MAP', 'UserPrice', 'JobberPrice', 'DistributorPrice']
+
+    FEATURE_COLUMNS = [f'Feature{i}' for i in range(1, 19)]
+
     def __init__(self, config: Optional[ReplinkConfig] = None):
         self.config = config or ReplinkConfig()
-
-    def load_feed(self, file_path: str) -> pd.DataFrame:
-        """Load pipe-delimited Replink feed."""
+        if self.config.price_column not in self.PRICE_COLUMNS:
+            raise ValueError(f"Unknown price column: {self.config.price_column}")
+        self.price_column = self.COLUMN_MAP[self.config.price_column]
+        self.import_date = pd.Timestamp.now()  # shared by every chunk of a run
+
+    def load_feed(self, file_path: str, chunksize: Optional[int] = None):
+        """
+        Load pipe-delimited Replink feed.
+
+        With chunksize, returns an iterator of DataFrames instead of one frame.
+        Only mapped and Feature columns are parsed, and ItemNumber is kept as text.
+        """
         logger.info(f"Loading Replink feed: {file_path}")
 
-        # Try different encodings
-        for encoding in ['utf-8', 'cp1252', 'latin-1']:
-            try:
-                df = pd.read_csv(file_path, delimiter='|', encoding=encoding)
-                logger.info(f"Loaded {len(df)} products (encoding: {encoding})")
-                return df
-            except UnicodeDecodeError:
-                continue
+        encoding = self._detect_encoding(file_path)
+        header = pd.read_csv(file_path, delimiter='|', encoding=encoding, nrows=0).columns
+        usecols = [c for c in header if c in self.COLUMN_MAP or c in self.FEATURE_COLUMNS]
+
+        # Arrow-backed columns either way. The multithreaded pyarrow parser cannot
+        # stream, so chunked reads stay on the C parser; round_trip makes its floats
+        # match pyarrow's exactly, or reconciling a whole --old feed against a
+        # chunked new one would flag last-digit price "changes".
+        if chunksize:
+            parser = {'engine': 'c', 'float_precision': 'round_trip', 'chunksize': chunksize}
+        else:
+            parser = {'engine': 'pyarrow'}
+        reader = pd.read_csv(
+            file_path,
+            delimiter='|',
+            encoding=encoding,
+            usecols=usecols,
+            dtype={'ItemNumber': str},
+            dtype_backend='pyarrow',
+            **parser,
+        )
+        if chunksize:
+            logger.info(f"Streaming in chunks of {chunksize} (encoding: {encoding})")
+            return reader
 
-        # Fallback
-        df = pd.read_csv(file_path, delimiter='|', encoding='utf-8', errors='replace')
-        logger.info(f"Loaded {len(df)} products (with replacement)")
+        df = reader
+        logger.info(f"Loaded {len(df)} products (encoding: {encoding})")
         return df
 
+    def _detect_encoding(self, file_path: str, block_size: int = 1 << 20) -> str:
+        """
+        Return the first of utf-8/cp1252 that decodes the whole file, else latin-1.
+
+        Both candidates are checked in a single pass over the raw bytes, so the
+        CSV itself is only parsed once.
+        """
+        decoders = {enc: codecs.getincrementaldecoder(enc)() for enc in ('utf-8', 'cp1252')}
+        with open(file_path, 'rb') as f:
+            while decoders:
+                block = f.read(block_size)
+                for enc, decoder in list(decoders.items()):
+                    try:
+                        decoder.decode(block, final=not block)
+                    except UnicodeDecodeError:
+                        del decoders[enc]
+                if not block:
+                    break
+        return next(iter(decoders), 'latin-1')
+
+    def transform_feed(self, file_path: str, chunksize: int = CHUNK_SIZE):
+        """Yield transformed chunks of a feed without loading it all at once."""
+        for chunk in self.load_feed(file_path, chunksize=chunksize):
+            yield self.transform(chunk)
+
     def transform(self, df: pd.DataFrame) -> pd.DataFrame:
         """Transform Replink format to CM format."""
         logger.info(f"Transforming {len(df)} products")
 
-        out = pd.DataFrame()
-
-        # Map columns
-        for replink_col, cm_col in self.COLUMN_MAP.items():
-            if replink_col in df.columns:
-                out[cm_col] = df[replink_col]
-            else:
-                out[cm_col] = np.nan
+        # Map columns in one projection; columns missing from the feed come back as NaN
+        out = df.reindex(columns=list(self.COLUMN_MAP)).rename(columns=self.COLUMN_MAP)
 
         # Build features/description
-        out['features'] = df.apply(self._build_features, axis=1)
+        features = self._build_features(df)
+        out['features'] = features.fillna('').astype(object)
 
         # Combine description with features
-        out['product_desc'] = out.apply(
-            lambda r: f"{r['product_desc']}\n\n{r['features']}"
-            if pd.notna(r['features']) and r['features']
-            else r['product_desc'],
-            axis=1
-        )
+        desc = out['product_desc'].astype(STRING_DTYPE)
+        combined = (desc + '\n\n' + features).fillna(features)
+        out['product_desc'] = out['product_desc'].where(features.isna(), combined.astype(object))
 
         # Determine enabled/disabled based on inventory
         out['qty_available'] = pd.to_numeric(out['qty_available'], errors='coerce').fillna(0)
         out['enabled'] = out['qty_available'] > self.config.enable_threshold
 
         # Select price column
-        out['price'] = pd.to_numeric(out.get(self.config.price_column.lower().replace('price', '_price'), out.get('distributor_price')), errors='coerce')
+        out['price'] = pd.to_numeric(out[self.price_column], errors='coerce')
 
         # Add metadata
         out['source'] = 'replink'
-        out['import_date'] = pd.Timestamp.now()
+        out['import_date'] = self.import_date
 
         if self.config.user_account_id:
             out['user_account_id'] = self.config.user_account_id
@@ -139,19 +204,26 @@ class ReplinkTransformer:
 
         return out
 
-    def _build_features(self, row: pd.Series) -> str:
-        """Combine Feature1-Feature18 into a bullet list."""
-        features = []
-        for i in range(1, 19):
-            feat = row.get(f'Feature{i}')
-            if pd.notna(feat) and str(feat).strip():
-                features.append(f"• {str(feat).strip()}")
-        return '\n'.join(features) if features else ''
+    def _build_features(self, df: pd.DataFrame) -> pd.Series:
+        """Combine Feature1-Feature18 into a bullet list (missing where a row has none)."""
+        features = pd.Series(pd.NA, index=df.index, dtype=STRING_DTYPE)
+        for col in self.FEATURE_COLUMNS:
+            if col not in df.columns:
+                continue
+            feat = df[col].astype(STRING_DTYPE).str.strip()
+            bullet = self.BULLET + feat.mask(feat.eq('').fillna(False))
+            features = (features + '\n' + bullet).fillna(features).fillna(bullet)
+        return features
 
     def split_by_status(self, df: pd.DataFrame) -> Tuple[pd.DataFrame, pd.DataFrame]:
-        """Split into enabled and disabled products."""
-        enabled = df[df['enabled'] == True].copy()
-        disabled = df[df['enabled'] == False].copy()
+        """
+        Split into enabled and disabled products.
+
+        Boolean indexing already returns new frames, so no extra copy is made;
+        callers only write them out.
+        """
+        enabled = df[df['enabled'] == True]
+        disabled = df[df['enabled'] == False]
         return enabled, disabled
 
 
@@ -168,46 +240,55 @@ class FeedReconciler:
     ) -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
         """Compare feeds and return (adds, updates, deletes)."""
 
-        old_keys = set(df_old[self.key_column].astype(str))
-        new_keys = set(df_new[self.key_column].astype(str))
+        old_keys = df_old[self.key_column].astype(str)
+        new_keys = df_new[self.key_column].astype(str)
+
+        # Pair up the first row per key on each side with one hash join
+        compare_cols = ['product', 'price', 'qty_available', 'enabled']
+        cols = [c for c in compare_cols if c in df_old.columns and c in df_new.columns]
+        old = df_old[cols].assign(_k=old_keys.to_numpy()).drop_duplicates('_k')
+        new = df_new[cols].assign(_k=new_keys.to_numpy(), _row=np.arange(len(df_new))).drop_duplicates('_k')
+        merged = old.merge(new, on='_k', how='outer', suffixes=('_old', '_new'), indicator=True)
 
         # New products
-        add_keys = new_keys - old_keys
-        adds = df_new[df_new[self.key_column].astype(str).isin(add_keys)].copy()
+        add_keys = merged.loc[merged['_merge'] == 'right_only', '_k']
+        adds = df_new.take(np.flatnonzero(new_keys.isin(add_keys)))
 
         # Removed products
-        del_keys = old_keys - new_keys
-        deletes = df_old[df_old[self.key_column].astype(str).isin(del_keys)].copy()
+        del_keys = merged.loc[merged['_merge'] == 'left_only', '_k']
+        deletes = df_old.take(np.flatnonzero(old_keys.isin(del_keys)))
 
-        # Products in both (potential updates)
-        common_keys = old_keys & new_keys
+        # Products in both: changed if any compared column differs
+        both = merged[merged['_merge'] == 'both']
+        changed = np.zeros(len(both), dtype=bool)
+        for col in cols:
+            changed |= self._values_differ(both[f'{col}_old'], both[f'{col}_new'])
 
-        # Check for changes in common products
-        updates_list = []
-        compare_cols = ['product', 'price', 'qty_available', 'enabled']
+        updates = df_new.take(np.sort(both.loc[changed, '_row'].to_numpy(dtype=np.int64)))
 
-        for key in common_keys:
-            old_row = df_old[df_old[self.key_column].astype(str) == key].iloc[0]
-            new_row = df_new[df_new[self.key_column].astype(str) == key].iloc[0]
+        logger.info(f"Reconciliation: {len(adds)} adds, {len(updates)} updates, {len(deletes)} deletes")
+        return adds, updates, deletes
 
-            changed = False
-            for col in compare_cols:
-                if col in old_row.index and col in new_row.index:
-                    old_val = old_row[col]
-                    new_val = new_row[col]
-                    if pd.isna(old_val) and pd.isna(new_val):
-                        continue
-                    if old_val != new_val:
-                        changed = True
-                        break
+    def _values_differ(self, old: pd.Series, new: pd.Series) -> np.ndarray:
+        """Element-wise inequality where missing on both sides counts as equal."""
+        if pd.api.types.is_numeric_dtype(old) and pd.api.types.is_numeric_dtype(new):
+            old_vals = old.to_numpy(dtype=np.float64, na_value=np.nan)
+            new_vals = new.to_numpy(dtype=np.float64, na_value=np.nan)
+            return (old_vals != new_vals) & ~(np.isnan(old_vals) & np.isnan(new_vals))
 
-            if changed:
-                updates_list.append(new_row)
+        old_vals = old.to_numpy(dtype=object, copy=True)
+        new_vals = new.to_numpy(dtype=object, copy=True)
+        old_vals[pd.isna(old_vals)] = None
+        new_vals[pd.isna(new_vals)] = None
+        return old_vals != new_vals
 
-        updates = pd.DataFrame(updates_list) if updates_list else pd.DataFrame(columns=df_new.columns)
 
-        logger.info(f"Reconciliation: {len(adds)} adds, {len(updates)} updates, {len(deletes)} deletes")
-        return adds, updates, deletes
+def write_frame(df: pd.DataFrame, path: Path):
+    """Write df as Parquet (zstd) or xlsx (xlsxwriter), depending on the path's extension."""
+    if path.suffix.lower() == '.parquet':
+        df.to_parquet(path, engine='pyarrow', compression='zstd', index=False)
+    else:
+        df.to_excel(path, index=False, engine='xlsxwriter', engine_kwargs=XLSX_ENGINE_KWARGS)
 
 
 def main():
@@ -219,8 +300,10 @@ def main():
     parser.add_argument('--old', help='Previous feed for reconciliation')
     parser.add_argument('--user-id', type=int, help='User account ID for import')
     parser.add_argument('--price-col', default='DistributorPrice',
-                       choices=['MSRP', 'MAP', 'UserPrice', 'JobberPrice', 'DistributorPrice'],
+                       choices=ReplinkTransformer.PRICE_COLUMNS,
                        help='Which price column to use')
+    parser.add_argument('--chunksize', type=int, default=CHUNK_SIZE,
+                        help=f'Feed rows processed per chunk (default: {CHUNK_SIZE})')
 
     args = parser.parse_args()
 
@@ -231,56 +314,88 @@ def main():
 
     transformer = ReplinkTransformer(config)
 
-    # Load and transform
-    df_raw = transformer.load_feed(args.input)
-    df_transformed = transformer.transform(df_raw)
-
-    # Split by status
-    enabled, disabled = transformer.split_by_status(df_transformed)
-
     # Save outputs
     output_path = Path(args.output)
     stem = output_path.stem
     parent = output_path.parent
-
-    # Main output
-    df_transformed.to_excel(output_path, index=False)
-    print(f"✅ Saved {len(df_transformed)} products to {output_path}")
-
-    # Enabled products
-    enabled_path = parent / f"{stem}_ENABLED.xlsx"
-    enabled.to_excel(enabled_path, index=False)
-    print(f"✅ {len(enabled)} enabled products → {enabled_path}")
-
-    # Disabled products
-    disabled_path = parent / f"{stem}_DISABLED.xlsx"
-    disabled.to_excel(disabled_path, index=False)
-    print(f"⏸️  {len(disabled)} disabled products → {disabled_path}")
+    ext = output_path.suffix or '.xlsx'
+    enabled_path = parent / f"{stem}_ENABLED{ext}"
+    disabled_path = parent / f"{stem}_DISABLED{ext}"
+
+    def concat_chunks(chunks: List[pd.DataFrame]) -> pd.DataFrame:
+        # A feed that yields no chunks still produces the output columns
+        if not chunks:
+            return transformer.transform(pd.DataFrame())
+        return pd.concat(chunks, ignore_index=True)
+
+    counts = {'all': 0, 'enabled': 0, 'disabled': 0}
+    kept = []
+    if ext.lower() == '.parquet':
+        # Parquet files are written whole so every chunk shares one schema
+        df_transformed = concat_chunks(list(transformer.transform_feed(args.input, chunksize=args.chunksize)))
+        enabled, disabled = transformer.split_by_status(df_transformed)
+        for key, path, part in [
+            ('all', output_path, df_transformed),
+            ('enabled', enabled_path, enabled),
+            ('disabled', disabled_path, disabled),
+        ]:
+            write_frame(part, path)
+            counts[key] = len(part)
+        kept.append(df_transformed)
+    else:
+        # Load, transform and write chunk by chunk; only keep the transformed
+        # rows in memory when they are needed for reconciliation
+        with pd.ExcelWriter(output_path, engine='xlsxwriter', engine_kwargs=XLSX_ENGINE_KWARGS) as all_writer, \
+                pd.ExcelWriter(enabled_path, engine='xlsxwriter', engine_kwargs=XLSX_ENGINE_KWARGS) as enabled_writer, \
+                pd.ExcelWriter(disabled_path, engine='xlsxwriter', engine_kwargs=XLSX_ENGINE_KWARGS) as disabled_writer:
+            for chunk in transformer.transform_feed(args.input, chunksize=args.chunksize):
+                enabled, disabled = transformer.split_by_status(chunk)
+                for key, writer, part in [
+                    ('all', all_writer, chunk),
+                    ('enabled', enabled_writer, enabled),
+                    ('disabled', disabled_writer, disabled),
+                ]:
+                    header = counts[key] == 0
+                    part.to_excel(writer, index=False, startrow=counts[key] + (not header), header=header)
+                    counts[key] += len(part)
+                if args.old:
+                    kept.append(chunk)
+
+    print(f"✅ Saved {counts['all']} products to {output_path}")
+    print(f"✅ {counts['enabled']} enabled products → {enabled_path}")
+    print(f"⏸️  {counts['disabled']} disabled products → {disabled_path}")
 
     # Reconcile if old file provided
     if args.old:
-        df_old = pd.read_excel(args.old) if args.old.endswith('.xlsx') else transformer.load_feed(args.old)
+        if args.old.endswith('.xlsx'):
+            df_old = pd.read_excel(args.old)
+        elif args.old.endswith('.parquet'):
+            df_old = pd.read_parquet(args.old)
+        else:
+            df_old = transformer.load_feed(args.old)
 
         # Transform old if it's raw Replink format
         if 'ItemNumber' in df_old.columns:
             df_old = transformer.transform(df_old)
 
+        df_transformed = concat_chunks(kept)
+
         reconciler = FeedReconciler()
         adds, updates, deletes = reconciler.reconcile(df_old, df_transformed)
 
         if len(adds) > 0:
-            adds_path = parent / f"{stem}_ADDS.xlsx"
-            adds.to_excel(adds_path, index=False)
+            adds_path = parent / f"{stem}_ADDS{ext}"
+            write_frame(adds, adds_path)
             print(f"📥 {len(adds)} new products → {adds_path}")
 
         if len(updates) > 0:
-            updates_path = parent / f"{stem}_UPDATES.xlsx"
-            updates.to_excel(updates_path, index=False)
+            updates_path = parent / f"{stem}_UPDATES{ext}"
+            write_frame(updates, updates_path)
             print(f"🔄 {len(updates)} updated products → {updates_path}")
 
         if len(deletes) > 0:
-            deletes_path = parent / f"{stem}_DELETES.xlsx"
-            deletes.to_excel(deletes_path, index=False)
+            deletes_path = parent / f"{stem}_DELETES{ext}"
+            write_frame(deletes, deletes_path)
             print(f"🗑️  {len(deletes)} removed products → {deletes_path}")
 
 
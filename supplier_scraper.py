@@ -24,20 +24,31 @@ Requirements:
 
 Environment:
     CRAWL4AI_URL: Crawl4AI endpoint (default: http://localhost:11235)
+    CRAWL4AI_PROFILE_DIR: Browser profile reused across crawls (default: /tmp/crawl4ai_profile)
     OLLAMA_URL: Ollama endpoint (default: http://localhost:11434)
     OLLAMA_MODEL: Model to use (default: qwen3:30b-a3b-instruct-2507)
+    OLLAMA_NUM_PARALLEL: Extraction requests sent to Ollama per burst (default: 8);
+        set it to match the Ollama server's own OLLAMA_NUM_PARALLEL
+    OLLAMA_EMBED_MODEL: Embedding model for --semantic-cache (default: nomic-embed-text)
 """
 
 import os
+import re
 import sys
 import json
+import time
+import base64
+import asyncio
 import logging
+import hashlib
 import httpx
-import pandas as pd
+import numpy as np
 from pathlib import Path
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, AsyncIterator, Tuple, Callable, Awaitable, TypeVar
+from contextlib import asynccontextmanager, nullcontext
+from functools import lru_cache
 from dataclasses import dataclass, field
-from urllib.parse import urljoin, quote
+from urllib.parse import urljoin, quote, urlparse
 
 logging.basicConfig(
     level=logging.INFO,
@@ -45,6 +56,53 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Outermost {...} block in an LLM response that wrapped its JSON in prose
+JSON_OBJECT_PATTERN = re.compile(r'\{[\s\S]*\}')
+
+# <img src="..."> URLs for the regex fallback extractor
+IMG_SRC_PATTERN = re.compile(r'<img[^>]+src=["\']([^"\']+)["\']', re.IGNORECASE)
+
+# Substrings (of the lowercased URL) marking likely product / non-product images
+PRODUCT_IMAGE_KEYWORDS = re.compile(r'product|item|large|main|hero')
+NON_PRODUCT_IMAGE_KEYWORDS = re.compile(r'logo|icon|banner|ad')
+
+# Class names of containers whose markup gives an image useful context for the LLM
+IMAGE_CONTEXT_CLASSES = re.compile(r'swatch|color|gallery|product', re.IGNORECASE)
+
+# Characters of distilled image markup sent to the LLM
+LLM_HTML_BUDGET = 4000
+
+# Attempts per outbound request; waits double from RETRY_BACKOFF seconds (1s, 2s)
+RETRY_ATTEMPTS = 3
+RETRY_BACKOFF = 1.0
+
+# Response codes worth another attempt
+RETRY_STATUS_CODES = frozenset((429, 502, 503, 504))
+
+# Products scraped at once by scrape_batch (crawl + LLM + downloads overlap)
+MAX_CONCURRENCY = 20
+
+# Connection pool shared by the requests of one client
+HTTP_LIMITS = httpx.Limits(max_connections=100, max_keepalive_connections=20)
+
+# Image downloads fan out across many CDN hosts, so they get a larger pool
+DOWNLOAD_LIMITS = httpx.Limits(max_connections=1000, max_keepalive_connections=100)
+
+# Images of one product downloaded at once
+DOWNLOADS_PER_PRODUCT = 8
+
+# Bytes read per chunk when streaming an image to disk
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+
+# Cached LLM extractions older than this are re-requested
+LLM_CACHE_TTL = 7 * 24 * 3600
+
+# Extraction requests kept in flight to Ollama at once (see OllamaBatcher)
+OLLAMA_BATCH_SIZE = int(os.environ.get('OLLAMA_NUM_PARALLEL', 8))
+
+# Cosine similarity above which a page counts as the same template as a cached one
+SEMANTIC_CACHE_THRESHOLD = 0.92
+
 
 # =============================================================================
 # SUPPLIER CONFIGURATIONS
@@ -110,36 +168,190 @@ SUPPLIERS: Dict[str, SupplierConfig] = {
 }
 
 
+@lru_cache(maxsize=None)
+def url_template(pattern: str) -> Optional[Tuple[str, ...]]:
+    """
+    Split a URL pattern around its {item_number} placeholders, once per pattern.
+
+    None if the pattern uses any other format syntax (escaped braces, other
+    fields), which then goes through str.format instead.
+    """
+    parts = tuple(pattern.split("{item_number}"))
+    if any("{" in part or "}" in part for part in parts):
+        return None
+    return parts
+
+
+@lru_cache(maxsize=4096)
+def build_url(pattern: str, item_number: str) -> str:
+    """Fill a supplier URL pattern with a URL-quoted item number. Cached per item."""
+    parts = url_template(pattern)
+    if parts is None:
+        return pattern.format(item_number=quote(item_number))
+    return quote(item_number).join(parts)
+
+
+@lru_cache(maxsize=8192)
+def resolve_url(base_url: Optional[str], url: str) -> str:
+    """Make a scraped image URL absolute against the supplier's catalog base. Cached."""
+    if url.startswith("//"):
+        return "https:" + url
+    elif url.startswith("/"):
+        return urljoin(base_url, url)
+    return url
+
+
+# =============================================================================
+# RETRIES
+# =============================================================================
+
+T = TypeVar('T')
+
+
+def _status_code(error: Exception) -> Optional[int]:
+    """HTTP status carried by an httpx or aiohttp error response, if any."""
+    if isinstance(error, httpx.HTTPStatusError):
+        return error.response.status_code
+    return getattr(error, 'status', None) if type(error).__module__.startswith('aiohttp') else None
+
+
+def is_retryable(error: Exception) -> bool:
+    """Timeouts, dropped connections and overload responses; not refused connections."""
+    status = _status_code(error)
+    if status is not None:
+        return status in RETRY_STATUS_CODES
+    if isinstance(error, httpx.ConnectError):
+        return False  # service is down; fail fast
+    if isinstance(error, (httpx.TimeoutException, httpx.TransportError, asyncio.TimeoutError)):
+        return True
+
+    try:
+        import aiohttp
+    except ImportError:
+        return False
+    if isinstance(error, aiohttp.ClientConnectorError):
+        return False
+    return isinstance(error, aiohttp.ClientError)
+
+
+async def with_retries(operation: Callable[[], Awaitable[T]], description: str) -> T:
+    """Await operation(), retrying transient HTTP failures with exponential backoff."""
+    for attempt in range(RETRY_ATTEMPTS):
+        try:
+            return await operation()
+        except Exception as e:
+            if attempt == RETRY_ATTEMPTS - 1 or not is_retryable(e):
+                raise
+            delay = RETRY_BACKOFF * 2 ** attempt
+            reason = _status_code(e) or type(e).__name__
+            logger.warning(f"{description} failed ({reason}), retrying in {delay:g}s")
+            await asyncio.sleep(delay)
+
+
+async def request_with_retry(client: httpx.AsyncClient, method: str, url: str, **kwargs) -> httpx.Response:
+    """Send a request (raising on HTTP errors) with with_retries()."""
+    async def send() -> httpx.Response:
+        response = await client.request(method, url, **kwargs)
+        response.raise_for_status()
+        return response
+
+    return await with_retries(send, f"{method} {url}")
+
+
+# =============================================================================
+# RATE LIMITING
+# =============================================================================
+
+class DomainRateLimiter:
+    """
+    Spaces requests to each host at least min_interval seconds apart.
+
+    Hosts are limited independently, so concurrent scrapes spread across
+    domains run in parallel while any one domain sees the configured pace.
+    Create inside the event loop that will use it.
+    """
+
+    def __init__(self, min_interval: float):
+        self.min_interval = min_interval
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._last: Dict[str, float] = {}
+
+    async def acquire(self, url: str):
+        if self.min_interval <= 0:
+            return
+        domain = urlparse(url).netloc
+        lock = self._locks.setdefault(domain, asyncio.Lock())
+        async with lock:
+            loop = asyncio.get_running_loop()
+            wait = self._last.get(domain, 0.0) + self.min_interval - loop.time()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            self._last[domain] = loop.time()
+
+
+def interleave_by_domain(urls: List[str]) -> List[int]:
+    """Order indexes of urls round-robin across their domains."""
+    buckets: Dict[str, List[int]] = {}
+    for i, url in enumerate(urls):
+        buckets.setdefault(urlparse(url or '').netloc, []).append(i)
+
+    order = []
+    queues = list(buckets.values())
+    for rank in range(max(map(len, queues), default=0)):
+        order.extend(q[rank] for q in queues if rank < len(q))
+    return order
+
+
 # =============================================================================
 # CRAWL4AI CLIENT
 # =============================================================================
 
 class Crawl4AIClient:
-    """Client for Crawl4AI service."""
+    """Client for Crawl4AI service.
 
-    def __init__(self, base_url: str = None):
+    The async client is opened with ``async with`` so its connections belong
+    to the event loop that uses them.
+    """
+
+    def __init__(self, base_url: str = None, profile_dir: str = None):
         self.base_url = base_url or os.environ.get('CRAWL4AI_URL', 'http://localhost:11235')
-        self.client = httpx.Client(timeout=60.0)
+        self.profile_dir = profile_dir or os.environ.get('CRAWL4AI_PROFILE_DIR', '/tmp/crawl4ai_profile')
+        self.client: Optional[httpx.AsyncClient] = None
+
+    async def __aenter__(self):
+        self.client = httpx.AsyncClient(timeout=60.0, limits=HTTP_LIMITS)
+        return self
 
-    def crawl(
+    async def __aexit__(self, *exc_info):
+        await self.client.aclose()
+        self.client = None
+
+    async def crawl(
         self,
         url: str,
         render_js: bool = True,
-        extract_links: bool = True,
-        screenshot: bool = True
+        extract_links: bool = False,
+        screenshot: bool = False,
+        session_id: str = None
     ) -> Dict[str, Any]:
-        """Crawl a URL and return results."""
+        """
+        Crawl a URL and return results.
+
+        With a session_id, Crawl4AI reuses that session's browser page (and
+        the persistent profile in profile_dir) instead of opening a new one.
+        """
+        payload = {
+            "url": url,
+            "render_js": render_js,
+            "extract_links": extract_links,
+            "screenshot": screenshot
+        }
+        if session_id:
+            payload["session_id"] = session_id
+            payload["browser_config"] = {"user_data_dir": self.profile_dir, "headless": True}
+
         try:
-            response = self.client.post(
-                f"{self.base_url}/crawl",
-                json={
-                    "url": url,
-                    "render_js": render_js,
-                    "extract_links": extract_links,
-                    "screenshot": screenshot
-                }
-            )
-            response.raise_for_status()
+            response = await request_with_retry(self.client, "POST", f"{self.base_url}/crawl", json=payload)
             return response.json()
         except httpx.ConnectError:
             logger.error(f"Cannot connect to Crawl4AI at {self.base_url}")
@@ -152,36 +364,169 @@ class Crawl4AIClient:
     def health(self) -> bool:
         """Check if Crawl4AI is healthy."""
         try:
-            response = self.client.get(f"{self.base_url}/health")
+            response = httpx.get(f"{self.base_url}/health", timeout=10.0)
             return response.status_code == 200
         except:
             return False
 
 
+# =============================================================================
+# LLM RESPONSE CACHE
+# =============================================================================
+
+class LLMCache:
+    """
+    Content-addressed on-disk cache of LLM extractions.
+
+    Entries live at {cache_dir}/{key[:2]}/{key}.json and are ignored once
+    older than ttl or written for a different model / prompt version.
+    """
+
+    def __init__(self, cache_dir: Path, ttl: int = LLM_CACHE_TTL):
+        self.cache_dir = Path(cache_dir)
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}.json"
+
+    def get(self, key: str, model: str, prompt_version: str) -> Optional[Dict[str, Any]]:
+        try:
+            entry = json.loads(self._path(key).read_text())
+        except (OSError, ValueError):
+            entry = {}
+
+        if (entry.get("model") != model
+                or entry.get("prompt_version") != prompt_version
+                or time.time() - entry.get("created_at", 0) > self.ttl):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry.get("response")
+
+    def set(self, key: str, response: Dict[str, Any], model: str, prompt_version: str):
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(path.name + '.tmp')
+        tmp_path.write_text(json.dumps({
+            "response": response,
+            "model": model,
+            "prompt_version": prompt_version,
+            "created_at": time.time(),
+        }))
+        os.replace(tmp_path, path)
+
+
+class SemanticLLMCache:
+    """
+    Near-miss cache for pages built from the same template as a cached one.
+
+    Stores (normalized embedding, item number, extraction) in
+    {cache_dir}/semantic.jsonl. A lookup takes the most similar cached
+    page; if it clears the threshold, the cached item number in its image
+    URLs is swapped for the new one. The result is used only if it has image
+    URLs and every rewritten one actually appears in the new page's HTML.
+    Anything else is a miss, so another product's images (or an empty
+    extraction) are never returned.
+    """
+
+    INDEX_FILE = 'semantic.jsonl'
+
+    def __init__(self, cache_dir: Path, model: str, prompt_version: str,
+                 threshold: float = SEMANTIC_CACHE_THRESHOLD, ttl: int = LLM_CACHE_TTL):
+        self.path = Path(cache_dir) / self.INDEX_FILE
+        self.model = model
+        self.prompt_version = prompt_version
+        self.threshold = threshold
+        self.hits = 0
+        self.misses = 0
+        self._entries: List[Dict[str, Any]] = []
+        self._vectors: Optional[np.ndarray] = None
+
+        now = time.time()
+        try:
+            with self.path.open() as f:
+                for line in f:
+                    entry = json.loads(line)
+                    if (entry.get("model") == model
+                            and entry.get("prompt_version") == prompt_version
+                            and now - entry.get("created_at", 0) <= ttl):
+                        self._entries.append(entry)
+        except (OSError, ValueError):
+            pass
+        if self._entries:
+            self._vectors = np.array([e["embedding"] for e in self._entries], dtype=np.float32)
+
+    @staticmethod
+    def _normalize(embedding: List[float]) -> np.ndarray:
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    @staticmethod
+    def _image_urls(extracted: Dict[str, Any]) -> List[str]:
+        urls = [extracted.get("main_image")]
+        urls += [c.get("url") for c in extracted.get("color_images", []) if isinstance(c, dict)]
+        urls += list(extracted.get("gallery_images", []))
+        return [u for u in urls if isinstance(u, str) and u]
+
+    def get(self, embedding: List[float], item_number: str, html: str) -> Optional[Dict[str, Any]]:
+        if self._vectors is None:
+            self.misses += 1
+            return None
+
+        # Inner product of unit vectors == cosine similarity
+        scores = self._vectors @ self._normalize(embedding)
+        best = int(scores.argmax())
+        if scores[best] < self.threshold:
+            self.misses += 1
+            return None
+
+        entry = self._entries[best]
+        adapted = json.loads(
+            json.dumps(entry["response"]).replace(json.dumps(entry["item_number"])[1:-1],
+                                                  json.dumps(item_number)[1:-1])
+        )
+        urls = self._image_urls(adapted)
+        if not urls or not all(url in html for url in urls):
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return adapted
+
+    def set(self, embedding: List[float], item_number: str, response: Dict[str, Any]):
+        entry = {
+            "embedding": self._normalize(embedding).tolist(),
+            "item_number": item_number,
+            "response": response,
+            "model": self.model,
+            "prompt_version": self.prompt_version,
+            "created_at": time.time(),
+        }
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self.path.open("a") as f:
+            f.write(json.dumps(entry) + "\n")
+
+        self._entries.append(entry)
+        vector = np.asarray(entry["embedding"], dtype=np.float32)[None, :]
+        self._vectors = vector if self._vectors is None else np.vstack([self._vectors, vector])
+
+
 # =============================================================================
 # LOCAL LLM CLIENT (OLLAMA)
 # =============================================================================
 
 class OllamaClient:
-    """Client for local Ollama inference."""
+    """Client for local Ollama inference (async; open with ``async with``)."""
 
-    def __init__(self, base_url: str = None, model: str = None):
-        self.base_url = base_url or os.environ.get('OLLAMA_URL', 'http://localhost:11434')
-        self.model = model or os.environ.get('OLLAMA_MODEL', 'qwen3:30b-a3b-instruct-2507')
-        self.client = httpx.Client(timeout=120.0)
+    # Bump whenever the extraction prompt changes so cached responses are dropped
+    PROMPT_VERSION = 'v2'
 
-    def extract_images(self, html: str, item_number: str) -> Dict[str, Any]:
-        """
-        Use LLM to extract image URLs from HTML.
-
-        Returns:
-            {
-                "main_image": "url",
-                "color_images": [{"color": "Navy Blue", "url": "..."}, ...],
-                "gallery_images": ["url1", "url2", ...]
-            }
-        """
-        prompt = f"""Analyze this HTML and extract all product image URLs for item number: {item_number}
+    # Identical for every request so Ollama can reuse its KV cache for it;
+    # the per-item values go after it
+    PROMPT_PREFIX = """Analyze the HTML below and extract all product image URLs for the given item number.
 
 Find:
 1. The main product image URL
@@ -189,44 +534,135 @@ Find:
 3. Any additional gallery/angle images
 
 Return ONLY valid JSON in this exact format:
-{{
+{
     "main_image": "url or null",
     "color_images": [
-        {{"color": "Color Name", "url": "image_url"}},
+        {"color": "Color Name", "url": "image_url"},
         ...
     ],
     "gallery_images": ["url1", "url2", ...]
-}}
+}
+
+---
+"""
+
+    # How long Ollama keeps the model (and its prompt cache) loaded between
+    # requests; long enough to span a full catalog run
+    KEEP_ALIVE = '1h'
+
+    def __init__(self, base_url: str = None, model: str = None, cache: LLMCache = None,
+                 semantic_cache_dir: Path = None):
+        self.base_url = base_url or os.environ.get('OLLAMA_URL', 'http://localhost:11434')
+        self.model = model or os.environ.get('OLLAMA_MODEL', 'qwen3:30b-a3b-instruct-2507')
+        self.embed_model = os.environ.get('OLLAMA_EMBED_MODEL', 'nomic-embed-text')
+        self.cache = cache
+        self.semantic_cache = None
+        if semantic_cache_dir:
+            self.semantic_cache = SemanticLLMCache(semantic_cache_dir, self.model, self.PROMPT_VERSION)
+        self.client: Optional[httpx.AsyncClient] = None
+
+    async def __aenter__(self):
+        self.client = httpx.AsyncClient(timeout=120.0, limits=HTTP_LIMITS)
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.client.aclose()
+        self.client = None
+
+    async def extract_images(self, html: str, item_number: str) -> Dict[str, Any]:
+        """
+        Use LLM to extract image URLs from HTML.
+
+        Returns:
+            {
+                "main_image": "url",
+                "color_images": [{"color": "Navy Blue", "url": "..."}, ...],
+                "gallery_images": ["url1", "url2", ...]
+            }
+        """
+        cached, cache_key, embedding = await self.lookup_cache(html, item_number)
+        if cached is not None:
+            return cached
+        return await self.generate(html, item_number, cache_key, embedding)
+
+    async def lookup_cache(
+        self, html: str, item_number: str
+    ) -> Tuple[Optional[Dict[str, Any]], Optional[str], Optional[List[float]]]:
+        """
+        Look an extraction up in the exact and semantic caches.
+
+        Returns (cached extraction or None, cache key, embedding); on a miss,
+        pass the key and embedding on to generate() so it can store the result.
+        """
+        html = html[:15000]
+
+        cache_key = None
+        if self.cache:
+            cache_key = hashlib.sha256(
+                f"{self.PROMPT_VERSION}|{self.model}|{item_number}|{html}".encode()
+            ).hexdigest()
+            cached = self.cache.get(cache_key, self.model, self.PROMPT_VERSION)
+            if cached is not None:
+                logger.info(f"LLM cache hit for {item_number}")
+                return cached, cache_key, None
+
+        embedding = None
+        if self.semantic_cache:
+            embedding = await self.embed(html)
+            if embedding:
+                cached = self.semantic_cache.get(embedding, item_number, html)
+                if cached is not None:
+                    logger.info(f"LLM semantic cache hit for {item_number}")
+                    if cache_key:
+                        self.cache.set(cache_key, cached, self.model, self.PROMPT_VERSION)
+                    return cached, cache_key, embedding
+
+        return None, cache_key, embedding
+
+    async def generate(self, html: str, item_number: str, cache_key: str = None,
+                       embedding: List[float] = None) -> Dict[str, Any]:
+        """Run the extraction prompt through Ollama, caching a successful result."""
+        html = html[:15000]
+
+        prompt = f"""{self.PROMPT_PREFIX}Item number: {item_number}
 
 HTML content (truncated to relevant parts):
-{html[:15000]}
+{html}
 
 JSON response:"""
 
         try:
-            response = self.client.post(
+            response = await request_with_retry(
+                self.client, "POST",
                 f"{self.base_url}/api/generate",
                 json={
                     "model": self.model,
                     "prompt": prompt,
                     "stream": False,
-                    "format": "json"
+                    "format": "json",
+                    "keep_alive": self.KEEP_ALIVE
                 }
             )
-            response.raise_for_status()
             result = response.json()
 
             # Parse the LLM response
             llm_response = result.get("response", "{}")
             try:
-                return json.loads(llm_response)
+                extracted = json.loads(llm_response)
             except json.JSONDecodeError:
                 # Try to extract JSON from response
-                import re
-                json_match = re.search(r'\{[\s\S]*\}', llm_response)
-                if json_match:
-                    return json.loads(json_match.group())
-                return {"error": "Could not parse LLM response", "raw": llm_response}
+                json_match = JSON_OBJECT_PATTERN.search(llm_response)
+                if not json_match:
+                    return {"error": "Could not parse LLM response", "raw": llm_response}
+                extracted = json.loads(json_match.group())
+
+            if isinstance(extracted, dict) and "error" not in extracted:
+                if cache_key:
+                    self.cache.set(cache_key, extracted, self.model, self.PROMPT_VERSION)
+                # An empty extraction can't be checked against another page
+                if embedding and self.semantic_cache._image_urls(extracted):
+                    self.semantic_cache.set(embedding, item_number, extracted)
+            return extracted
 
         except httpx.ConnectError:
             logger.warning(f"Cannot connect to Ollama at {self.base_url}")
@@ -235,15 +671,80 @@ JSON response:"""
             logger.error(f"LLM extraction failed: {e}")
             return {"error": str(e)}
 
+    async def embed(self, text: str) -> Optional[List[float]]:
+        """Embed text with the Ollama embedding model; None if unavailable."""
+        try:
+            response = await self.client.post(
+                f"{self.base_url}/api/embeddings",
+                json={"model": self.embed_model, "prompt": text}
+            )
+            response.raise_for_status()
+            return response.json().get("embedding") or None
+        except Exception as e:
+            logger.warning(f"Embedding failed: {e}")
+            return None
+
+    def warmup(self) -> bool:
+        """
+        Load the model (and pin it for KEEP_ALIVE) with a one-token generation,
+        so the first real extraction doesn't pay the cold model load.
+        """
+        try:
+            response = httpx.post(
+                f"{self.base_url}/api/generate",
+                json={
+                    "model": self.model,
+                    "prompt": "ok",
+                    "stream": False,
+                    "keep_alive": self.KEEP_ALIVE,
+                    "options": {"num_predict": 1}
+                },
+                timeout=300.0
+            )
+            response.raise_for_status()
+            return True
+        except Exception as e:
+            logger.warning(f"Ollama warm-up failed: {e}")
+            return False
+
     def health(self) -> bool:
         """Check if Ollama is healthy."""
         try:
-            response = self.client.get(f"{self.base_url}/api/tags")
+            response = httpx.get(f"{self.base_url}/api/tags", timeout=10.0)
             return response.status_code == 200
         except:
             return False
 
 
+class OllamaBatcher:
+    """
+    Keeps Ollama's OLLAMA_NUM_PARALLEL slots busy with concurrent extract_images calls.
+
+    Cache lookups run first, so hits never wait behind generation; misses
+    wait on a semaphore for one of max_batch_size in-flight generations.
+    Use as ``async with`` inside the event loop that will call it.
+    """
+
+    def __init__(self, ollama: OllamaClient, max_batch_size: int = OLLAMA_BATCH_SIZE):
+        self.ollama = ollama
+        self.max_batch_size = max(1, max_batch_size)
+        self._slots: Optional[asyncio.Semaphore] = None
+
+    async def __aenter__(self):
+        self._slots = asyncio.Semaphore(self.max_batch_size)
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self._slots = None
+
+    async def extract_images(self, html: str, item_number: str) -> Dict[str, Any]:
+        cached, cache_key, embedding = await self.ollama.lookup_cache(html, item_number)
+        if cached is not None:
+            return cached
+        async with self._slots:
+            return await self.ollama.generate(html, item_number, cache_key, embedding)
+
+
 # =============================================================================
 # IMAGE SCRAPER
 # =============================================================================
@@ -251,34 +752,121 @@ JSON response:"""
 class SupplierImageScraper:
     """Main scraper class that coordinates Crawl4AI and Ollama."""
 
+    HEADERS = {'User-Agent': 'Mozilla/5.0 (compatible; ProductImageBot/1.0)'}
+
     def __init__(
         self,
         supplier: SupplierConfig,
         crawl4ai: Crawl4AIClient = None,
         ollama: OllamaClient = None,
-        output_dir: str = "/tmp/scraped_images"
+        output_dir: str = "/tmp/scraped_images",
+        max_concurrency: int = MAX_CONCURRENCY,
+        capture_screenshot: bool = False,
+        force_refresh: bool = False
     ):
         self.supplier = supplier
         self.crawl4ai = crawl4ai or Crawl4AIClient()
         self.ollama = ollama or OllamaClient()
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(parents=True, exist_ok=True)
+        self.max_concurrency = max_concurrency
+        self.capture_screenshot = capture_screenshot
+        self.force_refresh = force_refresh
+        self.client: Optional[httpx.AsyncClient] = None
+        self.rate_limiter: Optional[DomainRateLimiter] = None
+        self.llm: Optional[OllamaBatcher] = None
+        self.aiohttp_session = None
+        self.crawl_sessions: Optional[asyncio.Queue] = None
+
+    @asynccontextmanager
+    async def session(self):
+        """Open the Crawl4AI, Ollama and image download clients for one run."""
+        async with self.crawl4ai, self.ollama, self._download_client() as client, \
+                (self._aiohttp_session() or nullcontext()) as aiohttp_session, \
+                OllamaBatcher(self.ollama) as llm:
+            self.client = client
+            self.aiohttp_session = aiohttp_session
+            self.llm = llm
+            self.rate_limiter = DomainRateLimiter(self.supplier.delay_ms / 1000)
+
+            # One warm Crawl4AI browser session per concurrent worker; a
+            # session drives a single page, so workers must not share one
+            self.crawl_sessions = asyncio.Queue()
+            for i in range(self.max_concurrency):
+                self.crawl_sessions.put_nowait(f"scraper_{self.supplier.code}_{i}")
+            try:
+                yield self
+            finally:
+                self.client = None
+                self.aiohttp_session = None
+                self.llm = None
+                self.rate_limiter = None
+                self.crawl_sessions = None
+
+    def _download_client(self) -> httpx.AsyncClient:
+        """Create the pooled image client; HTTP/2 multiplexing is used when h2 is installed."""
+        try:
+            import h2  # noqa: F401
+            http2 = True
+        except ImportError:
+            http2 = False
+
+        return httpx.AsyncClient(
+            http2=http2,
+            headers=self.HEADERS,
+            timeout=30.0,
+            follow_redirects=True,
+            limits=DOWNLOAD_LIMITS,
+        )
+
+    def _aiohttp_session(self):
+        """
+        Create an aiohttp session for image downloads, or None without aiohttp.
+
+        aiohttp streams many concurrent small GETs at a fraction of httpx's
+        CPU cost; the Crawl4AI / Ollama JSON calls stay on httpx. Uses the
+        aiodns resolver when installed.
+        """
+        try:
+            import aiohttp
+        except ImportError:
+            return None
+
+        try:
+            import aiodns  # noqa: F401
+            resolver = aiohttp.AsyncResolver()
+        except ImportError:
+            resolver = None
+
+        connector = aiohttp.TCPConnector(
+            limit=100,
+            limit_per_host=DOWNLOADS_PER_PRODUCT,
+            ttl_dns_cache=300,
+            resolver=resolver,
+        )
+        return aiohttp.ClientSession(
+            connector=connector,
+            headers=self.HEADERS,
+            timeout=aiohttp.ClientTimeout(total=30),
+            raise_for_status=True,
+        )
 
     def build_product_url(self, item_number: str) -> Optional[str]:
         """Build product page URL from item number."""
-        if self.supplier.product_url_pattern:
-            return self.supplier.product_url_pattern.format(
-                item_number=quote(item_number)
-            )
-        elif self.supplier.search_url_pattern:
-            return self.supplier.search_url_pattern.format(
-                item_number=quote(item_number)
-            )
-        return None
+        pattern = self.supplier.product_url_pattern or self.supplier.search_url_pattern
+        return build_url(pattern, item_number) if pattern else None
 
     def scrape_product_images(self, item_number: str) -> Dict[str, Any]:
+        """Scrape all images for a single product (sync wrapper)."""
+        return asyncio.run(self._scrape_single(item_number))
+
+    async def _scrape_single(self, item_number: str) -> Dict[str, Any]:
+        async with self.session():
+            return await self.scrape_product_images_async(item_number)
+
+    async def scrape_product_images_async(self, item_number: str) -> Dict[str, Any]:
         """
-        Scrape all images for a product.
+        Scrape all images for a product. Requires an open session().
 
         Returns:
             {
@@ -289,6 +877,8 @@ class SupplierImageScraper:
                 "color_images": [{"color": "...", "url": "..."}],
                 "gallery_images": ["url", ...],
                 "downloaded": {"main": "local_path", "colors": {...}},
+                "screenshot": "local_path (only with capture_screenshot)",
+                "extraction_method": "dom, llm or regex",
                 "error": "if any"
             }
         """
@@ -300,6 +890,7 @@ class SupplierImageScraper:
             "color_images": [],
             "gallery_images": [],
             "downloaded": {},
+            "extraction_method": None,
             "error": None
         }
 
@@ -313,52 +904,157 @@ class SupplierImageScraper:
         logger.info(f"Scraping {item_number} from {url}")
 
         # Crawl the page
-        crawl_result = self.crawl4ai.crawl(
-            url,
-            render_js=self.supplier.render_js,
-            screenshot=True
-        )
+        await self.rate_limiter.acquire(url)
+        session_id = await self.crawl_sessions.get()
+        try:
+            crawl_result = await self.crawl4ai.crawl(
+                url,
+                render_js=self.supplier.render_js,
+                screenshot=self.capture_screenshot,
+                session_id=session_id
+            )
+        finally:
+            self.crawl_sessions.put_nowait(session_id)
 
         if "error" in crawl_result:
             result["error"] = crawl_result["error"]
             return result
 
+        if crawl_result.get("screenshot"):
+            screenshot_path = self.output_dir / f"{item_number}_page.png"
+            screenshot_path.write_bytes(base64.b64decode(crawl_result["screenshot"]))
+            result["screenshot"] = str(screenshot_path)
+
         html = crawl_result.get("html", "")
         if not html:
             result["error"] = "No HTML content returned"
             return result
 
-        # Extract images using LLM
-        extracted = self.ollama.extract_images(html, item_number)
-
-        if "error" in extracted:
-            # Fallback: try regex extraction
-            logger.warning(f"LLM extraction failed, trying regex fallback")
-            extracted = self._regex_extract_images(html)
+        # The supplier's CSS selectors settle the page when they find both a
+        # main image and a gallery; otherwise ask the LLM
+        dom_extracted = self._dom_extract_images(html, url)
+        if dom_extracted and dom_extracted["main_image"] and dom_extracted["gallery_images"]:
+            extracted = dom_extracted
+            result["extraction_method"] = "dom"
+        else:
+            extracted = await self.llm.extract_images(self._distill_html_for_llm(html), item_number)
+            result["extraction_method"] = "llm"
+
+            if "error" in extracted:
+                # Fallback: whatever the selectors found, then regex
+                logger.warning(f"LLM extraction failed, trying selector fallback")
+                if dom_extracted:
+                    extracted = dom_extracted
+                    result["extraction_method"] = "dom"
+                else:
+                    extracted = self._regex_extract_images(html)
+                    result["extraction_method"] = "regex"
 
         result["main_image"] = extracted.get("main_image")
         result["color_images"] = extracted.get("color_images", [])
         result["gallery_images"] = extracted.get("gallery_images", [])
 
         # Download images
-        result["downloaded"] = self._download_images(item_number, extracted)
+        result["downloaded"] = await self._download_images(item_number, extracted)
 
         return result
 
-    def _regex_extract_images(self, html: str) -> Dict[str, Any]:
-        """Fallback regex-based image extraction."""
-        import re
+    def _distill_html_for_llm(self, html: str) -> str:
+        """
+        Cut a page down to the markup the LLM needs to find product images.
 
-        # Find all image URLs
-        img_pattern = r'<img[^>]+src=["\']([^"\']+)["\']'
-        all_images = re.findall(img_pattern, html, re.IGNORECASE)
+        Keeps every <img> / <picture> source, each with the opening part of
+        its nearest swatch / color / gallery / product container (so color
+        names next to swatches survive), up to LLM_HTML_BUDGET characters.
+        Returns html unchanged when selectolax is not installed or the page
+        has no images.
+        """
+        try:
+            from selectolax.lexbor import LexborHTMLParser
+        except ImportError:
+            return html
+
+        tree = LexborHTMLParser(html)
+        pieces: List[str] = []
+        seen = set()
+        total = 0
+        for node in tree.css('img, picture source'):
+            snippet = node.html
+            ancestor = node.parent
+            for _ in range(3):
+                if ancestor is None or ancestor.tag in ('body', 'html'):
+                    break
+                if IMAGE_CONTEXT_CLASSES.search(ancestor.attributes.get('class') or ''):
+                    context = ancestor.html[:300]
+                    snippet = context if snippet in context else f"{context}...{snippet}"
+                    break
+                ancestor = ancestor.parent
+
+            if snippet in seen:
+                continue
+            seen.add(snippet)
+            if total + len(snippet) > LLM_HTML_BUDGET and pieces:
+                break
+            pieces.append(snippet)
+            total += len(snippet)
+
+        return "\n".join(pieces) or html
+
+    def _dom_extract_images(self, html: str, page_url: str) -> Optional[Dict[str, Any]]:
+        """
+        Selector-based image extraction using the supplier's CSS selectors.
 
+        Returns None when selectolax is not installed or the selectors match
+        nothing, so the caller can fall back to regex.
+        """
+        try:
+            from selectolax.lexbor import LexborHTMLParser
+        except ImportError:
+            return None
+
+        def src(node) -> Optional[str]:
+            value = node.attributes.get('src') or node.attributes.get('data-src')
+            return urljoin(page_url, value.strip()) if value else None
+
+        tree = LexborHTMLParser(html)
+
+        main_node = tree.css_first(self.supplier.main_image_selector)
+        main_image = src(main_node) if main_node else None
+
+        color_images = []
+        for node in tree.css(self.supplier.color_name_selector):
+            img = node if node.tag == 'img' else node.css_first('img')
+            url = src(img) if img else None
+            if url:
+                color = (node.attributes.get('data-color') or node.text(strip=True)
+                         or img.attributes.get('alt') or 'unknown')
+                color_images.append({"color": color, "url": url})
+
+        seen = {main_image} | {c["url"] for c in color_images}
+        gallery_images = []
+        for node in tree.css(self.supplier.gallery_selector):
+            url = src(node)
+            if url and url not in seen:
+                seen.add(url)
+                gallery_images.append(url)
+
+        if not (main_image or color_images or gallery_images):
+            return None
+        return {
+            "main_image": main_image,
+            "color_images": color_images,
+            "gallery_images": gallery_images
+        }
+
+    def _regex_extract_images(self, html: str) -> Dict[str, Any]:
+        """Fallback regex-based image extraction."""
         # Filter for likely product images
-        product_images = [
-            img for img in all_images
-            if any(kw in img.lower() for kw in ['product', 'item', 'large', 'main', 'hero'])
-            and not any(skip in img.lower() for skip in ['logo', 'icon', 'banner', 'ad'])
-        ]
+        product_images = []
+        for img in IMG_SRC_PATTERN.findall(html):
+            lowered = img.lower()
+            if (PRODUCT_IMAGE_KEYWORDS.search(lowered)
+                    and not NON_PRODUCT_IMAGE_KEYWORDS.search(lowered)):
+                product_images.append(img)
 
         return {
             "main_image": product_images[0] if product_images else None,
@@ -366,84 +1062,237 @@ class SupplierImageScraper:
             "gallery_images": product_images[1:] if len(product_images) > 1 else []
         }
 
-    def _download_images(self, item_number: str, extracted: Dict) -> Dict[str, str]:
-        """Download extracted images to local filesystem."""
-        downloaded = {}
+    async def _download_images(self, item_number: str, extracted: Dict) -> Dict[str, str]:
+        """
+        Download extracted images to local filesystem.
 
-        # Download main image
+        A product's images are fetched concurrently (DOWNLOADS_PER_PRODUCT at
+        a time). A URL repeated across main / colors / gallery is fetched once
+        and its path reused for every slot that references it.
+        """
+        # (slot, key, url, file suffix) for each image, in main / colors / gallery order
+        slots = []
         main_url = extracted.get("main_image")
         if main_url:
-            path = self._download_single(main_url, item_number, "main")
-            if path:
-                downloaded["main"] = path
-
-        # Download color images
-        color_images = {}
+            slots.append(("main", None, main_url, "main"))
         for color_info in extracted.get("color_images", []):
             color = color_info.get("color", "unknown")
             url = color_info.get("url")
             if url:
-                path = self._download_single(url, item_number, f"color_{color}")
-                if path:
-                    color_images[color] = path
-        if color_images:
-            downloaded["colors"] = color_images
-
-        # Download gallery images
-        gallery_paths = []
+                slots.append(("colors", color, url, f"color_{color}"))
         for i, url in enumerate(extracted.get("gallery_images", [])[:5]):  # Limit to 5
-            path = self._download_single(url, item_number, f"gallery_{i}")
-            if path:
-                gallery_paths.append(path)
-        if gallery_paths:
-            downloaded["gallery"] = gallery_paths
+            if url:
+                slots.append(("gallery", i, url, f"gallery_{i}"))
+        slots = [(slot, key, self._resolve_image_url(url), suffix) for slot, key, url, suffix in slots]
+
+        # Each distinct URL is named after the first slot that uses it; a name
+        # another URL already took (e.g. two colors both "unknown") gets a
+        # numeric tail so concurrent downloads never share a file
+        suffixes: Dict[str, str] = {}
+        taken = set()
+        for _, _, url, suffix in slots:
+            if url in suffixes:
+                continue
+            unique, n = suffix, 1
+            while self._safe_suffix(unique) in taken:
+                unique = f"{suffix}_{n}"
+                n += 1
+            taken.add(self._safe_suffix(unique))
+            suffixes[url] = unique
+
+        semaphore = asyncio.Semaphore(DOWNLOADS_PER_PRODUCT)
+
+        async def fetch(url: str) -> Optional[str]:
+            async with semaphore:
+                return await self._download_single(url, item_number, suffixes[url])
+
+        urls = list(suffixes)
+        paths = dict(zip(urls, await asyncio.gather(*(fetch(url) for url in urls))))
+
+        downloaded = {}
+        for slot, key, url, _ in slots:
+            path = paths[url]
+            if not path:
+                continue
+            if slot == "main":
+                downloaded["main"] = path
+            elif slot == "colors":
+                downloaded.setdefault("colors", {})[key] = path
+            else:
+                downloaded.setdefault("gallery", []).append(path)
 
         return downloaded
 
-    def _download_single(self, url: str, item_number: str, suffix: str) -> Optional[str]:
-        """Download a single image."""
+    @staticmethod
+    def _safe_suffix(suffix: str) -> str:
+        """Make an image suffix safe to use in a filename."""
+        return suffix.replace(" ", "_").replace("/", "-")
+
+    def _resolve_image_url(self, url: str) -> str:
+        """Make a scraped image URL absolute."""
+        return resolve_url(self.supplier.catalog_base_url, url)
+
+    async def _download_single(self, url: str, item_number: str, suffix: str) -> Optional[str]:
+        """
+        Stream a single (absolute) image URL to disk in DOWNLOAD_CHUNK_SIZE pieces.
+
+        The body goes to a .part file renamed into place once complete, so a
+        failed download never leaves a truncated image behind; that also makes
+        an existing non-empty file safe to keep unless force_refresh is set.
+        """
         if not url:
             return None
 
+        part_path = None
         try:
-            # Make URL absolute if needed
-            if url.startswith("//"):
-                url = "https:" + url
-            elif url.startswith("/"):
-                url = urljoin(self.supplier.catalog_base_url, url)
-
             # Determine extension
             ext = Path(url.split("?")[0]).suffix or ".jpg"
-            safe_suffix = suffix.replace(" ", "_").replace("/", "-")
-            filename = f"{item_number}_{safe_suffix}{ext}"
+            filename = f"{item_number}_{self._safe_suffix(suffix)}{ext}"
             local_path = self.output_dir / filename
 
-            # Download
-            response = httpx.get(url, timeout=30.0, follow_redirects=True)
-            response.raise_for_status()
-
-            local_path.write_bytes(response.content)
-            logger.info(f"Downloaded: {filename} ({len(response.content)} bytes)")
+            if not self.force_refresh and local_path.exists() and local_path.stat().st_size > 0:
+                logger.debug(f"Already downloaded: {filename}")
+                return str(local_path)
+
+            # Download (each attempt rewrites the .part file from the start)
+            part_path = local_path.with_name(filename + '.part')
+
+            async def fetch() -> int:
+                await self.rate_limiter.acquire(url)
+                total_bytes = 0
+                with open(part_path, 'wb') as f:
+                    if self.aiohttp_session is not None:
+                        async with self.aiohttp_session.get(url) as response:
+                            async for chunk in response.content.iter_chunked(DOWNLOAD_CHUNK_SIZE):
+                                f.write(chunk)
+                                total_bytes += len(chunk)
+                    else:
+                        async with self.client.stream("GET", url) as response:
+                            response.raise_for_status()
+                            async for chunk in response.aiter_bytes(DOWNLOAD_CHUNK_SIZE):
+                                f.write(chunk)
+                                total_bytes += len(chunk)
+                return total_bytes
+
+            total_bytes = await with_retries(fetch, f"Download of {url}")
+            os.replace(part_path, local_path)
+            logger.info(f"Downloaded: {filename} ({total_bytes} bytes)")
 
             return str(local_path)
 
         except Exception as e:
             logger.warning(f"Failed to download {url}: {e}")
+            if part_path:
+                part_path.unlink(missing_ok=True)
             return None
 
     def scrape_batch(self, item_numbers: List[str]) -> List[Dict[str, Any]]:
-        """Scrape images for multiple products."""
-        results = []
-        for item_number in item_numbers:
-            result = self.scrape_product_images(item_number)
-            results.append(result)
+        """Scrape images for multiple products (sync wrapper)."""
+        return asyncio.run(self.scrape_batch_async(item_numbers))
+
+    async def scrape_batch_async(self, item_numbers: List[str]) -> List[Dict[str, Any]]:
+        """
+        Scrape images for multiple products concurrently.
+
+        Results come back in the order of item_numbers.
+        """
+        results: List[Optional[Dict[str, Any]]] = [None] * len(item_numbers)
+        async for index, result in self._iter_batch(item_numbers):
+            results[index] = result
         return results
 
+    def scrape_batch_to_jsonl(self, item_numbers: List[str], path: Path) -> Dict[str, int]:
+        """
+        Scrape multiple products, writing each result to path as one JSON line
+        the moment it completes (completion order, not input order).
+
+        Returns total / success / failed counts.
+        """
+        return asyncio.run(self._scrape_batch_to_jsonl(item_numbers, Path(path)))
+
+    async def _scrape_batch_to_jsonl(self, item_numbers: List[str], path: Path) -> Dict[str, int]:
+        try:
+            import orjson
+            dumps = orjson.dumps
+        except ImportError:
+            def dumps(obj) -> bytes:
+                return json.dumps(obj).encode()
+
+        counts = {"total": 0, "success": 0, "failed": 0}
+        with path.open("wb") as f:
+            async for _, result in self._iter_batch(item_numbers):
+                f.write(dumps(result) + b"\n")
+                counts["total"] += 1
+                counts["success"] += bool(result.get("downloaded"))
+                counts["failed"] += bool(result.get("error"))
+        return counts
+
+    async def _iter_batch(self, item_numbers: List[str]) -> AsyncIterator[Tuple[int, Dict[str, Any]]]:
+        """
+        Yield (index, result) for each product as it finishes.
+
+        At most max_concurrency products are in flight at once, started in
+        round-robin domain order so concurrent workers hit distinct hosts.
+        """
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        order = interleave_by_domain([self.build_product_url(item) for item in item_numbers])
+
+        async def bounded(index: int) -> Tuple[int, Dict[str, Any]]:
+            async with semaphore:
+                return index, await self.scrape_product_images_async(item_numbers[index])
+
+        async with self.session():
+            tasks = [asyncio.ensure_future(bounded(i)) for i in order]
+            try:
+                for next_done in asyncio.as_completed(tasks):
+                    yield await next_done
+            finally:
+                for task in tasks:
+                    task.cancel()
+
 
 # =============================================================================
 # CLI
 # =============================================================================
 
+def load_item_numbers(path: str) -> List[str]:
+    """
+    Read the item_number column of an .xlsx or CSV file, skipping blanks.
+
+    Only that column is read: CSV through pyarrow's reader (as text, so
+    leading zeros survive), xlsx through a read-only openpyxl row stream.
+    """
+    if path.endswith('.xlsx'):
+        from openpyxl import load_workbook
+
+        workbook = load_workbook(path, read_only=True, data_only=True)
+        try:
+            rows = workbook.active.iter_rows(values_only=True)
+            header = next(rows, ())
+            if 'item_number' not in header:
+                raise KeyError(f"No item_number column in {path}")
+            index = header.index('item_number')
+            return [
+                str(row[index]) for row in rows
+                if index < len(row) and row[index] is not None and row[index] != ''
+            ]
+        finally:
+            workbook.close()
+
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+
+    table = pa_csv.read_csv(
+        path,
+        convert_options=pa_csv.ConvertOptions(
+            include_columns=['item_number'],
+            column_types={'item_number': pa.string()},
+            strings_can_be_null=True,
+        ),
+    )
+    return [value for value in table.column('item_number').to_pylist() if value is not None]
+
+
 def main():
     import argparse
 
@@ -458,6 +1307,16 @@ def main():
                        help='Discover supplier URL patterns (interactive)')
     parser.add_argument('--check-services', action='store_true',
                        help='Check if Crawl4AI and Ollama are running')
+    parser.add_argument('--no-llm-cache', action='store_true',
+                       help='Always call the LLM instead of reusing cached extractions')
+    parser.add_argument('--semantic-cache', action='store_true',
+                       help='Reuse extractions from near-identical template pages (needs OLLAMA_EMBED_MODEL)')
+    parser.add_argument('--screenshot', action='store_true',
+                       help='Also save a screenshot of each product page')
+    parser.add_argument('--force-refresh', action='store_true',
+                       help='Re-download images that already exist in the output directory')
+    parser.add_argument('--concurrency', type=int, default=MAX_CONCURRENCY,
+                       help=f'Products to scrape at once (default: {MAX_CONCURRENCY})')
 
     args = parser.parse_args()
 
@@ -466,7 +1325,11 @@ def main():
 
     # Initialize clients
     crawl4ai = Crawl4AIClient()
-    ollama = OllamaClient()
+    cache_dir = Path(args.output_dir) / ".llm_cache"
+    ollama = OllamaClient(
+        cache=None if args.no_llm_cache else LLMCache(cache_dir),
+        semantic_cache_dir=cache_dir if args.semantic_cache else None
+    )
 
     # Check services
     if args.check_services:
@@ -480,7 +1343,10 @@ def main():
         supplier=supplier,
         crawl4ai=crawl4ai,
         ollama=ollama,
-        output_dir=args.output_dir
+        output_dir=args.output_dir,
+        max_concurrency=args.concurrency,
+        capture_screenshot=args.screenshot,
+        force_refresh=args.force_refresh
     )
 
     if args.discover:
@@ -500,28 +1366,25 @@ def main():
 
     # Scrape from file
     if args.input:
-        if args.input.endswith('.xlsx'):
-            df = pd.read_excel(args.input)
-        else:
-            df = pd.read_csv(args.input)
-
-        item_numbers = df['item_number'].dropna().astype(str).tolist()
+        item_numbers = load_item_numbers(args.input)
         logger.info(f"Scraping {len(item_numbers)} products...")
 
-        results = scraper.scrape_batch(item_numbers)
+        logger.info(f"Warming up {ollama.model}...")
+        ollama.warmup()
+
+        # Results are streamed to disk as products finish
+        results_path = Path(args.output_dir) / "scrape_results.jsonl"
+        counts = scraper.scrape_batch_to_jsonl(item_numbers, results_path)
 
         # Summary
-        success = sum(1 for r in results if r.get('downloaded'))
-        failed = sum(1 for r in results if r.get('error'))
         print(f"\n=== Scrape Summary ===")
-        print(f"Total: {len(results)}")
-        print(f"Success: {success}")
-        print(f"Failed: {failed}")
+        print(f"Total: {counts['total']}")
+        print(f"Success: {counts['success']}")
+        print(f"Failed: {counts['failed']}")
         print(f"Images saved to: {args.output_dir}")
-
-        # Save results
-        results_path = Path(args.output_dir) / "scrape_results.json"
-        results_path.write_text(json.dumps(results, indent=2))
+        for label, cache in (("LLM cache", ollama.cache), ("Semantic cache", ollama.semantic_cache)):
+            if cache:
+                print(f"{label}: {cache.hits} hits, {cache.misses} misses")
         print(f"Results saved to: {results_path}")
         return
 